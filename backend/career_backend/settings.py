@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import copy
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -58,6 +59,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -86,12 +88,17 @@ WSGI_APPLICATION = 'career_backend.wsgi.application'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 USE_SQLITE = os.getenv('USE_SQLITE', '1') == '1'
+# WAL, relaxed fsync and a busy timeout for concurrent requests; SQLITE_TUNING=0 keeps SQLite's defaults.
+SQLITE_TUNING = os.getenv('SQLITE_TUNING', '1') == '1'
 
 if USE_SQLITE:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / os.getenv('SQLITE_DB_NAME', 'db.sqlite3'),
+            # Take the write lock when a transaction starts, so a read-then-write
+            # transaction waits for busy_timeout instead of failing with "database is locked".
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE'} if SQLITE_TUNING else {},
         }
     }
 else:
@@ -105,6 +112,61 @@ else:
             'PORT': os.getenv('POSTGRES_PORT', '5432'),
         }
     }
+    # Check connections before reuse; with the pool, Django hands
+    # ConnectionPool.check_connection to psycopg only when this is set.
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    if os.getenv('POSTGRES_POOL', '0') == '1':
+        # psycopg's pool keeps connections open across requests itself, so
+        # Django requires CONN_MAX_AGE = 0 alongside it.
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.getenv('POSTGRES_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.getenv('POSTGRES_POOL_MAX_SIZE', 10)),
+                'timeout': float(os.getenv('POSTGRES_POOL_TIMEOUT', 10)),
+                'max_lifetime': float(os.getenv('POSTGRES_POOL_MAX_LIFETIME', 30 * 60)),
+            },
+        }
+    else:
+        # Persistent connections per worker thread.
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('POSTGRES_CONN_MAX_AGE', 60))
+
+# Optional read replica (core.routers): safe requests read from it unless the
+# user wrote in the last REPLICA_PIN_SECONDS. Tests mirror it onto default.
+if USE_SQLITE and os.getenv('SQLITE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **copy.deepcopy(DATABASES['default']),
+        'NAME': BASE_DIR / os.getenv('SQLITE_REPLICA_NAME'),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif not USE_SQLITE and os.getenv('POSTGRES_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **copy.deepcopy(DATABASES['default']),
+        'HOST': os.getenv('POSTGRES_REPLICA_HOST'),
+        'PORT': os.getenv('POSTGRES_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+READ_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+if READ_REPLICAS:
+    # Pins must be seen by every worker process, which the local-memory
+    # default cannot do. Create the table with ``manage.py createcachetable``.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': os.getenv('CACHE_TABLE', 'django_cache'),
+        },
+    }
+
+# Applied to each new SQLite connection by core.sqlite.apply_sqlite_pragmas.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -32000)),  # Negative means KiB: ~32 MB per connection.
+    'temp_store': 'MEMORY',
+} if SQLITE_TUNING else {}
 
 
 # Password validation
@@ -184,6 +246,18 @@ REST_FRAMEWORK = {
     ),
 }
 
+# PDF rendering: 'process' renders on a worker pool, 'inline' in the calling thread.
+PDF_RENDER_BACKEND = os.getenv('PDF_RENDER_BACKEND', 'process')
+PDF_RENDER_WORKERS = int(os.getenv('PDF_RENDER_WORKERS', min(os.cpu_count() or 2, 8)))
+PDF_RENDER_TIMEOUT = float(os.getenv('PDF_RENDER_TIMEOUT', 60))
+PDF_RENDER_MAX_TASKS_PER_CHILD = int(os.getenv('PDF_RENDER_MAX_TASKS_PER_CHILD', 200))
+# Rendered PDFs keyed by content fingerprint; pruned by run_export_worker.
+PDF_CACHE_DIR = os.getenv('PDF_CACHE_DIR', BASE_DIR / 'pdf_cache')
+PDF_CACHE_MAX_AGE_HOURS = int(os.getenv('PDF_CACHE_MAX_AGE_HOURS', 24 * 7))
+
+# Completed tests older than this are compacted into ArchivedTest rows by archive_tests.
+ARCHIVE_TESTS_AFTER_DAYS = int(os.getenv('ARCHIVE_TESTS_AFTER_DAYS', 180))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv('ACCESS_TOKEN_LIFETIME_MINUTES', 60))),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=int(os.getenv('REFRESH_TOKEN_LIFETIME_DAYS', 7))),
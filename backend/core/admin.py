@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Q
 
 from .forms import CustomUserChangeForm, CustomUserCreationForm
 from .models import (
@@ -14,13 +15,38 @@ from .models import (
     QuestionCategory,
     QuestionTemplate,
     Question,
+    RecommendationCompany,
+    RecommendationExportJob,
     ResourceCategory,
     RoadmapStep,
+    SearchDocument,
     StudentAnswer,
     StudentResourceProgress,
     TestRequest,
     User,
 )
+from .search import matching_ids
+
+
+class FullTextSearchMixin:
+    """
+    Answer the changelist search box (and autocomplete) from core.search
+    instead of ``icontains`` scans over the ``indexed_fields``. The other
+    ``search_fields`` (related names the index does not hold) still match
+    the whole search term with ``icontains``.
+    """
+    search_kind = None
+    indexed_fields = ()
+    search_help_text = 'Full-text search: matches all words, including word prefixes.'
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        matches = Q(pk__in=matching_ids(self.search_kind, search_term))
+        for field in self.get_search_fields(request):
+            if field not in self.indexed_fields:
+                matches |= Q(**{f'{field}__icontains': search_term.strip()})
+        return queryset.filter(matches), False
 
 
 @admin.register(User)
@@ -86,7 +112,9 @@ class QuestionCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(QuestionTemplate)
-class QuestionTemplateAdmin(admin.ModelAdmin):
+class QuestionTemplateAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = SearchDocument.Kind.QUESTION_TEMPLATE
+    indexed_fields = ('prompt',)
     list_display = ('prompt', 'category', 'order', 'is_active', 'created_at')
     list_filter = ('category', 'is_active')
     search_fields = ('prompt', 'category__name')
@@ -96,25 +124,29 @@ class QuestionTemplateAdmin(admin.ModelAdmin):
 
 @admin.register(PersonalizedTest)
 class PersonalizedTestAdmin(admin.ModelAdmin):
-    list_display = ('id', 'request', 'admin', 'status', 'assigned_at')
-    list_filter = ('status',)
+    list_display = ('id', 'request', 'admin', 'status', 'assigned_at', 'archived_at')
+    list_filter = ('status', ('archived_at', admin.EmptyFieldListFilter))
     search_fields = ('request__student__email',)
 
 
+class RecommendationCompanyInline(admin.TabularInline):
+    model = RecommendationCompany
+    extra = 0
+    autocomplete_fields = ('company',)
+    verbose_name_plural = 'Companies (displayed as tags to the student, in this order)'
+
+
 @admin.register(CareerRecommendation)
 class CareerRecommendationAdmin(admin.ModelAdmin):
     list_display = ('id', 'personalized_test', 'career_name', 'created_at')
-    search_fields = ('career_name', 'summary', 'companies')
+    search_fields = ('career_name', 'summary', 'companies__name')
     list_filter = ('created_at',)
     readonly_fields = ('created_at',)
+    inlines = [RecommendationCompanyInline]
     fieldsets = (
         ('Basic Information', {
             'fields': ('personalized_test', 'admin', 'career_name', 'summary')
         }),
-        ('Companies', {
-            'fields': ('companies',),
-            'description': 'Enter one company name per line. These will be displayed as tags to the student.'
-        }),
         ('Metadata', {
             'fields': ('created_at',),
             'classes': ('collapse',)
@@ -142,7 +174,9 @@ class ResourceCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(CareerResource)
-class CareerResourceAdmin(admin.ModelAdmin):
+class CareerResourceAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = SearchDocument.Kind.RESOURCE
+    indexed_fields = ('title', 'description')
     list_display = ('title', 'resource_type', 'category', 'career_recommendation', 'difficulty_level', 'is_free', 'is_active', 'created_at')
     list_filter = ('resource_type', 'difficulty_level', 'is_free', 'is_active', 'category')
     search_fields = ('title', 'description', 'career_recommendation__career_name')
@@ -200,7 +234,9 @@ class CompanyCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Company)
-class CompanyAdmin(admin.ModelAdmin):
+class CompanyAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = SearchDocument.Kind.COMPANY
+    indexed_fields = ('name', 'email', 'description')
     list_display = ('name', 'email', 'category', 'industry', 'location', 'is_active', 'created_at')
     list_filter = ('is_active', 'industry', 'category')
     search_fields = ('name', 'email', 'description')
@@ -228,7 +264,9 @@ class CompanyAdmin(admin.ModelAdmin):
 
 
 @admin.register(JobRecommendation)
-class JobRecommendationAdmin(admin.ModelAdmin):
+class JobRecommendationAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = SearchDocument.Kind.JOB
+    indexed_fields = ('job_title', 'company__name', 'job_description')
     list_display = ('job_title', 'company', 'career_recommendation', 'job_type', 'is_active', 'order')
     list_filter = ('job_type', 'is_active', 'company')
     search_fields = ('job_title', 'company__name', 'job_description')
@@ -250,3 +288,11 @@ class JobRecommendationAdmin(admin.ModelAdmin):
         }),
     )
     readonly_fields = ('created_at',)
+
+
+@admin.register(RecommendationExportJob)
+class RecommendationExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recommendation', 'requested_by', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('recommendation__career_name', 'requested_by__email')
+    readonly_fields = ('fingerprint', 'created_at', 'started_at', 'finished_at')
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.core import checks
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .routers import check_replica_cache
+        from .sqlite import apply_sqlite_pragmas
+
+        checks.register(check_replica_cache, checks.Tags.caches)
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='core.sqlite_pragmas')
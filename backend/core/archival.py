@@ -0,0 +1,159 @@
+"""
+Compact old completed tests into ArchivedTest snapshots.
+
+Once a test is completed its Question, Option and StudentAnswer rows are only
+read back when an admin reviews the answers, yet they make up most of the
+database. archive_tests() folds each test older than ARCHIVE_TESTS_AFTER_DAYS
+into one compressed JSON document and deletes those rows in batches. Readers
+go through test_snapshot(), which returns the same structure for live and
+archived tests:
+
+    {"version": 1, "test_id": 7, "assigned_at": "...", "completed_at": "...",
+     "questions": [{"id", "prompt", "order", "template_id",
+                    "options": [{"id", "label", "description", "order"}]}],
+     "answers": [{"question_id", "option_id", "student_id", "submitted_at"}]}
+
+Timestamps are ISO 8601 strings; ids are the ids the rows had before deletion.
+"""
+import json
+import zlib
+from collections import Counter
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import ArchivedTest, Option, PersonalizedTest, Question, StudentAnswer
+
+SNAPSHOT_VERSION = 1
+DEFAULT_BATCH_SIZE = 100
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def build_snapshot(test):
+    """Snapshot of a test's live rows; prefetch 'questions__options' and 'answers' for many tests."""
+    return {
+        'version': SNAPSHOT_VERSION,
+        'test_id': test.id,
+        'assigned_at': _isoformat(test.assigned_at),
+        'completed_at': _isoformat(test.completed_at),
+        'questions': [
+            {
+                'id': question.id,
+                'prompt': question.prompt,
+                'order': question.order,
+                'template_id': question.template_id,
+                'options': [
+                    {'id': option.id, 'label': option.label, 'description': option.description, 'order': option.order}
+                    for option in question.options.all()
+                ],
+            }
+            for question in test.questions.all()
+        ],
+        'answers': [
+            {
+                'question_id': answer.question_id,
+                'option_id': answer.option_id,
+                'student_id': answer.student_id,
+                'submitted_at': _isoformat(answer.submitted_at),
+            }
+            for answer in sorted(test.answers.all(), key=lambda answer: answer.id)
+        ],
+    }
+
+
+def encode_snapshot(snapshot):
+    """Return ``(compressed, raw_size)``."""
+    raw = json.dumps(snapshot, separators=(',', ':'), ensure_ascii=False).encode()
+    return zlib.compress(raw, 9), len(raw)
+
+
+def decode_snapshot(archive):
+    return json.loads(zlib.decompress(bytes(archive.snapshot)))
+
+
+def test_snapshot(test):
+    """The test's questions and answers, from its archive or its live rows."""
+    if test.archived_at:
+        return decode_snapshot(test.archive)
+    return build_snapshot(test)
+
+
+def answer_sheet(snapshot):
+    """Questions with their options and the chosen one, as AdminTestAnswersView returns them."""
+    selected = {answer['question_id']: answer['option_id'] for answer in snapshot['answers']}
+    sheet = []
+    for question in snapshot['questions']:
+        labels = {option['id']: option['label'] for option in question['options']}
+        option_id = selected.get(question['id'])
+        sheet.append({
+            'question': {'id': question['id'], 'prompt': question['prompt'], 'order': question['order']},
+            'options': [
+                {key: option[key] for key in ('id', 'label', 'description', 'order')}
+                for option in question['options']
+            ],
+            'selected_answer': {
+                'option_id': option_id,
+                'option_label': labels[option_id],
+            } if option_id in labels else None,
+        })
+    return sheet
+
+
+def archivable_tests(older_than):
+    return PersonalizedTest.objects.filter(
+        status=PersonalizedTest.Status.COMPLETED,
+        archived_at__isnull=True,
+        completed_at__lt=older_than,
+    ).order_by('completed_at', 'id')
+
+
+def archive_tests(older_than, batch_size=DEFAULT_BATCH_SIZE, limit=None):
+    """
+    Archive completed tests finished before ``older_than``, ``batch_size``
+    tests per transaction. Returns a Counter of tests archived, rows deleted
+    and bytes stored.
+    """
+    stats = Counter()
+    while limit is None or stats['tests'] < limit:
+        size = batch_size if limit is None else min(batch_size, limit - stats['tests'])
+        with transaction.atomic():
+            tests = list(archivable_tests(older_than).select_for_update(skip_locked=True)[:size])
+            if not tests:
+                break
+            models.prefetch_related_objects(tests, 'questions__options', 'answers')
+            archives = []
+            for test in tests:
+                snapshot = build_snapshot(test)
+                compressed, raw_size = encode_snapshot(snapshot)
+                archives.append(ArchivedTest(
+                    personalized_test=test,
+                    format_version=SNAPSHOT_VERSION,
+                    snapshot=compressed,
+                    raw_size=raw_size,
+                ))
+                stats['raw_bytes'] += raw_size
+                stats['stored_bytes'] += len(compressed)
+            ArchivedTest.objects.bulk_create(archives)
+
+            # Plain DELETE statements: QuerySet.delete() would load every row and
+            # fire the per-row counter signals, each with its own UPDATE.
+            test_ids = [test.id for test in tests]
+            for key, model, lookup in (
+                ('answers', StudentAnswer, 'personalized_test_id__in'),
+                ('options', Option, 'question__personalized_test_id__in'),
+                ('questions', Question, 'personalized_test_id__in'),
+            ):
+                stats[key] += model.objects.filter(**{lookup: test_ids})._raw_delete(model.objects.db)
+
+            # The counters now describe the archive.
+            archived_at = timezone.now()
+            for test in tests:
+                test.archived_at = archived_at
+                test.questions_count = len(test.questions.all())
+                test.answered_count = len(test.answers.all())
+            PersonalizedTest.objects.bulk_update(tests, ['archived_at', 'questions_count', 'answered_count'])
+            stats['tests'] += len(tests)
+    return stats
@@ -0,0 +1,204 @@
+"""
+Synthetic fixtures and measurements for PDF rendering benchmarks.
+
+Nothing here touches the database: recommendations and students are plain
+objects shaped like the model instances generate_recommendation_pdf reads.
+"""
+import multiprocessing
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+import reportlab
+from reportlab.pdfgen import canvas
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from . import pdf_generator
+
+PAGE_PATTERN = re.compile(rb'/Type /Page\b(?!s)')
+
+
+class _StepList(list):
+    """Stands in for the ``recommendation.steps`` related manager."""
+
+    def all(self):
+        return self
+
+    def order_by(self, *fields):
+        return self
+
+
+def synthetic_recommendation(step_count, summary_words=120, description_words=40):
+    return SimpleNamespace(
+        career_name='Data Scientist',
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        summary=' '.join(['Analytical'] * summary_words),
+        steps=_StepList(
+            SimpleNamespace(order=order, title=f'Step {order}', description=' '.join(['Practice'] * description_words))
+            for order in range(1, step_count + 1)
+        ),
+    )
+
+
+def synthetic_student():
+    return SimpleNamespace(
+        get_full_name=lambda: 'Benchmark Student',
+        email='benchmark@example.com',
+        qualification='B.Tech Computer Science',
+    )
+
+
+def count_pages(pdf_bytes):
+    return len(PAGE_PATTERN.findall(pdf_bytes))
+
+
+def _peak_render(recommendation, student):
+    tracemalloc.start()
+    try:
+        pdf_bytes = pdf_generator.generate_recommendation_pdf(recommendation, student).getvalue()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pdf_bytes, peak
+
+
+class _PlainCanvas(canvas.Canvas):
+    """Stands in for NumberedCanvas: same arguments, no page numbers."""
+
+    def __init__(self, *args, theme=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+
+def measure_page_numbering(step_counts):
+    """
+    Compare peak traced memory of a render with and without page numbering.
+
+    The difference is what numbering costs; it should stay flat as the number
+    of roadmap steps (and pages) grows.
+    """
+    student = synthetic_student()
+    # Warm the style catalog so one-off setup is not counted.
+    pdf_generator.generate_recommendation_pdf(synthetic_recommendation(1), student)
+    rows = []
+    for step_count in step_counts:
+        recommendation = synthetic_recommendation(step_count)
+        with mock.patch.object(pdf_generator, 'NumberedCanvas', _PlainCanvas):
+            _, plain_peak = _peak_render(recommendation, student)
+        pdf_bytes, numbered_peak = _peak_render(recommendation, student)
+        rows.append({
+            'steps': step_count,
+            'pages': count_pages(pdf_bytes),
+            'plain_peak_kib': plain_peak // 1024,
+            'numbered_peak_kib': numbered_peak // 1024,
+            'numbering_overhead_kib': (numbered_peak - plain_peak) // 1024,
+        })
+    return rows
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_kib():
+    """
+    High-water resident set size of this process, or None where unavailable.
+    It never goes down, so run_render_benchmark() measures each case in a
+    fresh process.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and KiB elsewhere.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def measure_case(steps, summary_words, description_words, repeat):
+    """
+    Render one synthetic report ``repeat`` times and summarise the timings.
+
+    Memory is measured in a separate traced render so tracemalloc overhead does
+    not inflate the timings.
+    """
+    recommendation = synthetic_recommendation(steps, summary_words, description_words)
+    student = synthetic_student()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pdf_bytes = pdf_generator.generate_recommendation_pdf(recommendation, student).getvalue()
+        timings.append(time.perf_counter() - started)
+    _, traced_peak = _peak_render(recommendation, student)
+    timings.sort()
+    pages = count_pages(pdf_bytes)
+    median = percentile(timings, 0.5)
+    return {
+        'steps': steps,
+        'summary_words': summary_words,
+        'description_words': description_words,
+        'repeat': repeat,
+        'pages': pages,
+        'output_bytes': len(pdf_bytes),
+        'p50_ms': round(median * 1000, 3),
+        'p90_ms': round(percentile(timings, 0.9) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+        'pages_per_second': round(pages / median, 2) if median else None,
+        'tracemalloc_peak_kib': traced_peak // 1024,
+        'peak_rss_kib': peak_rss_kib(),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _measure_isolated_case(*args):
+    # Warm imports and the style catalog so they are not timed; they still
+    # count towards peak_rss_kib, equally for every case.
+    pdf_generator.generate_recommendation_pdf(synthetic_recommendation(1), synthetic_student())
+    return measure_case(*args)
+
+
+def run_render_benchmark(step_counts, summary_word_counts, description_words=40, repeat=20):
+    """
+    Benchmark every (steps, summary words) combination and return a
+    machine-readable report, tagged with enough environment detail to compare
+    runs across commits. Each case runs in its own spawned process, so its
+    peak RSS is not the high-water mark of an earlier, larger case.
+    """
+    context = multiprocessing.get_context('spawn')
+    cases = []
+    for steps in step_counts:
+        for summary_words in summary_word_counts:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                cases.append(pool.submit(
+                    _measure_isolated_case, steps, summary_words, description_words, repeat,
+                ).result())
+    return {
+        'benchmark': 'recommendation_pdf',
+        'recorded_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'reportlab': reportlab.Version,
+        'platform': platform.platform(),
+        'theme_version': pdf_generator.DEFAULT_THEME.version,
+        'cases': cases,
+    }
@@ -0,0 +1,46 @@
+"""
+Connection reuse settings and psycopg pool counters for each database alias.
+
+Pools live in the worker process, so the numbers describe whichever worker
+served the request; ``pid`` tells them apart when scraping.
+"""
+import os
+
+from django.db import connections
+
+POOL_COUNTERS = (
+    'requests_num', 'requests_queued', 'requests_wait_ms', 'requests_errors', 'requests_waiting',
+    'usage_ms', 'connections_num', 'connections_ms', 'connections_errors', 'connections_lost', 'returns_bad',
+)
+
+
+def pool_stats(pool):
+    """psycopg_pool stats with zeroed counters filled in and the averages we alert on."""
+    stats = pool.get_stats()
+    counters = {name: stats.get(name, 0) for name in POOL_COUNTERS}
+    return {
+        'min_size': stats.get('pool_min', pool.min_size),
+        'max_size': stats.get('pool_max', pool.max_size),
+        'size': stats.get('pool_size', 0),
+        'available': stats.get('pool_available', 0),
+        **counters,
+        # Checkouts that had to queue for a free connection, and how long they waited.
+        'avg_wait_ms': round(counters['requests_wait_ms'] / counters['requests_queued'], 2)
+        if counters['requests_queued'] else 0,
+        'avg_connect_ms': round(counters['connections_ms'] / counters['connections_num'], 2)
+        if counters['connections_num'] else 0,
+    }
+
+
+def connection_stats():
+    databases = {}
+    for alias in connections:
+        wrapper = connections[alias]
+        pool = getattr(wrapper, 'pool', None) if wrapper.vendor == 'postgresql' else None
+        databases[alias] = {
+            'vendor': wrapper.vendor,
+            'conn_max_age': wrapper.settings_dict['CONN_MAX_AGE'],
+            'health_checks': wrapper.settings_dict['CONN_HEALTH_CHECKS'],
+            'pool': pool_stats(pool) if pool is not None else None,
+        }
+    return {'pid': os.getpid(), 'databases': databases}
@@ -0,0 +1,105 @@
+"""
+File downloads with validators and byte ranges.
+
+Django's FileResponse streams a file and sets Content-Length, but ignores
+``Range`` and conditional headers, so an interrupted mobile download would
+start over from the first byte.
+"""
+import re
+
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _RangeFile:
+    """Read at most ``length`` bytes from ``start``; no seek/tell, so FileResponse won't size it."""
+
+    def __init__(self, fileobj, start, length):
+        fileobj.seek(start)
+        self._file = fileobj
+        self._remaining = length
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single ``bytes=`` range, ``None``
+    to send the whole file, or ``False`` when the range cannot be satisfied.
+    Multi-range requests get the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def file_download(request, fileobj, size, etag, filename, content_type):
+    """
+    Serve an open binary file with Content-Length, a strong ETag and
+    single-range support (honouring If-None-Match and If-Range).
+    """
+    quoted_etag = quote_etag(etag)
+    if_none_match = request.headers.get('If-None-Match')
+    # If-None-Match uses the weak comparison: W/"x" matches "x".
+    if if_none_match and (
+        quoted_etag in {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+        or if_none_match.strip() == '*'
+    ):
+        fileobj.close()
+        response = HttpResponseNotModified()
+        response['ETag'] = quoted_etag
+        return response
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and (not if_range or if_range.strip() == quoted_etag):
+        byte_range = parse_range(range_header, size)
+
+    if byte_range is False:
+        fileobj.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is None:
+        response = FileResponse(fileobj, as_attachment=True, filename=filename, content_type=content_type)
+        response['Content-Length'] = str(size)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            _RangeFile(fileobj, start, end - start + 1),
+            status=206,
+            as_attachment=True,
+            filename=filename,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = quoted_etag
+    return response
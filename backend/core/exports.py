@@ -0,0 +1,340 @@
+"""
+Background and bulk rendering of recommendation PDFs.
+
+Students create an export job, a worker pool started with the
+``run_export_worker`` management command renders it, and the student polls the
+job until the file is ready. Jobs for unchanged content are coalesced.
+
+Admins can also stream a whole cohort as a ZIP. Rendering itself goes through
+the configured backend in ``core.rendering``.
+"""
+import logging
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CareerRecommendation, RecommendationExportJob
+from .rendering import RenderUnavailable, get_renderer, render_recommendation_pdf
+from .report_formats import PDF, TEXT_RENDERERS
+from .report_snapshot import build_render_snapshot, snapshot_fingerprint
+
+logger = logging.getLogger(__name__)
+
+LIVE_STATUSES = (
+    RecommendationExportJob.Status.PENDING,
+    RecommendationExportJob.Status.RUNNING,
+    RecommendationExportJob.Status.SUCCEEDED,
+)
+MAX_ATTEMPTS = 3
+
+
+def export_filename(recommendation, extension='pdf'):
+    return f"CareerPath_Recommendation_{recommendation.career_name.replace(' ', '_')}_{recommendation.created_at.strftime('%Y%m%d')}.{extension}"
+
+
+def recommendation_fingerprint(recommendation, student):
+    return snapshot_fingerprint(build_render_snapshot(recommendation, student))
+
+
+def _write_text(path, text):
+    partial = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.part")
+    try:
+        partial.write_text(text, encoding='utf-8')
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+def cached_export(recommendation, student, export_format=PDF):
+    """
+    Return ``(path, fingerprint)`` of the export for this exact content,
+    rendering it into the file cache only on a miss. PDFs go through the
+    configured render backend; text formats are built in-process.
+    """
+    snapshot = build_render_snapshot(recommendation, student)
+    fingerprint = snapshot_fingerprint(snapshot)
+    cache_dir = Path(settings.PDF_CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{fingerprint}.{export_format.extension}"
+    try:
+        # Touch on hit so prune_pdf_cache() drops the least recently used files.
+        os.utime(path)
+    except FileNotFoundError:
+        if export_format == PDF:
+            get_renderer().render_file(snapshot, path)
+        else:
+            _write_text(path, TEXT_RENDERERS[export_format.name](snapshot))
+    return path, fingerprint
+
+
+def prune_pdf_cache(max_age):
+    """Delete cached exports not served within ``max_age``; return how many went."""
+    cutoff = time.time() - max_age.total_seconds()
+    cache_dir = Path(settings.PDF_CACHE_DIR)
+    if not cache_dir.is_dir():
+        return 0
+    removed = 0
+    # Includes partial files left behind by a crashed render.
+    for path in cache_dir.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def request_export(recommendation, user):
+    """
+    Return ``(job, created)``: the live job already covering this exact content,
+    or a new pending one.
+    """
+    fingerprint = recommendation_fingerprint(recommendation, recommendation.personalized_test.request.student)
+    existing = RecommendationExportJob.objects.filter(
+        recommendation=recommendation,
+        fingerprint=fingerprint,
+        status__in=LIVE_STATUSES,
+    ).first()
+    if existing:
+        return existing, False
+    try:
+        with transaction.atomic():
+            job = RecommendationExportJob.objects.create(
+                recommendation=recommendation,
+                requested_by=user,
+                fingerprint=fingerprint,
+            )
+    except IntegrityError:
+        # A concurrent request created the same job first.
+        job = RecommendationExportJob.objects.get(
+            recommendation=recommendation,
+            fingerprint=fingerprint,
+            status__in=LIVE_STATUSES,
+        )
+        return job, False
+    return job, True
+
+
+def min_stale_after():
+    """
+    Running jobs younger than this may still be rendering: a live worker
+    gives up on a render after PDF_RENDER_TIMEOUT and marks the job failed.
+    """
+    return timedelta(seconds=2 * settings.PDF_RENDER_TIMEOUT + 60)
+
+
+def requeue_stale_jobs(stale_after):
+    """Put jobs back in the queue when their worker died mid-render."""
+    cutoff = timezone.now() - stale_after
+    stale = RecommendationExportJob.objects.filter(
+        status=RecommendationExportJob.Status.RUNNING,
+        started_at__lt=cutoff,
+    )
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=RecommendationExportJob.Status.FAILED,
+        error='Render timed out.',
+        finished_at=timezone.now(),
+    )
+    return stale.update(status=RecommendationExportJob.Status.PENDING)
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest pending job to running.
+
+    The claim is a conditional UPDATE, so concurrent workers never render the
+    same job twice, on any database backend.
+    """
+    candidates = RecommendationExportJob.objects.filter(
+        status=RecommendationExportJob.Status.PENDING,
+    ).order_by('created_at').values_list('id', flat=True)[:10]
+    for job_id in candidates:
+        claimed = RecommendationExportJob.objects.filter(
+            id=job_id,
+            status=RecommendationExportJob.Status.PENDING,
+        ).update(
+            status=RecommendationExportJob.Status.RUNNING,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return RecommendationExportJob.objects.get(id=job_id)
+    return None
+
+
+def render_job(job):
+    recommendation = CareerRecommendation.objects.select_related(
+        'personalized_test__request__student'
+    ).prefetch_related('steps').get(id=job.recommendation_id)
+    student = recommendation.personalized_test.request.student
+    try:
+        pdf_bytes = render_recommendation_pdf(recommendation, student)
+        job.file.save(f"{job.fingerprint}.pdf", ContentFile(pdf_bytes), save=False)
+    except RenderUnavailable as exc:
+        # Timeouts and lost workers are worth another try, up to MAX_ATTEMPTS.
+        logger.warning("Export job %s was interrupted: %s", job.id, exc)
+        running = RecommendationExportJob.objects.filter(id=job.id, status=RecommendationExportJob.Status.RUNNING)
+        if running.filter(attempts__lt=MAX_ATTEMPTS).update(status=RecommendationExportJob.Status.PENDING):
+            return False
+        running.update(
+            status=RecommendationExportJob.Status.FAILED,
+            error=str(exc)[:1000],
+            finished_at=timezone.now(),
+        )
+        return False
+    except Exception as exc:
+        logger.exception("Export job %s failed", job.id)
+        RecommendationExportJob.objects.filter(id=job.id, status=RecommendationExportJob.Status.RUNNING).update(
+            status=RecommendationExportJob.Status.FAILED,
+            error=str(exc)[:1000],
+            finished_at=timezone.now(),
+        )
+        return False
+    RecommendationExportJob.objects.filter(id=job.id, status=RecommendationExportJob.Status.RUNNING).update(
+        status=RecommendationExportJob.Status.SUCCEEDED,
+        file=job.file.name,
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def _work(stop_event, poll_interval, once):
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if once:
+                    return
+                stop_event.wait(poll_interval)
+                continue
+            render_job(job)
+    finally:
+        connections.close_all()
+
+
+def _requeue_periodically(stop_event, stale_after, interval):
+    try:
+        while not stop_event.wait(interval.total_seconds()):
+            close_old_connections()
+            requeued = requeue_stale_jobs(stale_after)
+            if requeued:
+                logger.warning("Requeued %s stale export job(s).", requeued)
+    finally:
+        connections.close_all()
+
+
+def run_worker(workers=2, poll_interval=2.0, once=False, stale_after=timedelta(minutes=10), stop_event=None,
+               requeue_interval=timedelta(minutes=1)):
+    """
+    Render jobs on ``workers`` threads until ``stop_event`` is set, or until the
+    queue is empty when ``once`` is true.
+
+    Jobs left running by a dead worker are requeued at start and then every
+    ``requeue_interval``. ``stale_after`` is raised to min_stale_after() so
+    jobs that other live workers are still rendering are never requeued.
+    """
+    stop_event = stop_event or threading.Event()
+    stale_after = max(stale_after, min_stale_after())
+    requeue_stale_jobs(stale_after)
+    with ThreadPoolExecutor(max_workers=workers + 1, thread_name_prefix='export-worker') as pool:
+        futures = [pool.submit(_work, stop_event, poll_interval, once) for _ in range(workers)]
+        if not once:
+            futures.append(pool.submit(_requeue_periodically, stop_event, stale_after, requeue_interval))
+        try:
+            while not all(future.done() for future in futures):
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            stop_event.set()
+    for future in futures:
+        future.result()
+
+
+class _ZipSink:
+    """Write-only stream: ZipFile appends to it and the response drains it."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def cohort_entries(recommendations):
+    """Yield ``(archive name, snapshot)`` pairs without loading the whole cohort."""
+    queryset = recommendations.select_related('personalized_test__request__student').prefetch_related('steps')
+    for recommendation in queryset.order_by('id').iterator(chunk_size=200):
+        student = recommendation.personalized_test.request.student
+        yield (
+            f"{recommendation.id:06d}_{export_filename(recommendation)}",
+            build_render_snapshot(recommendation, student),
+        )
+
+
+def iter_cohort_zip(entries, workers):
+    """
+    Yield the bytes of a ZIP holding one PDF per ``(name, snapshot)`` entry.
+
+    At most ``2 * workers`` renders are in flight on the configured backend,
+    and each PDF is written to the archive (and released) as soon as it
+    finishes, so memory stays bounded whatever the cohort size. Failed renders
+    are listed in ``errors.txt`` instead of aborting the archive.
+    """
+    renderer = get_renderer()
+    sink = _ZipSink()
+    failures = []
+    entries = iter(entries)
+    in_flight = {}
+    try:
+        with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+            exhausted = False
+            while True:
+                while not exhausted and len(in_flight) < 2 * workers:
+                    try:
+                        name, snapshot = next(entries)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight[renderer.submit(snapshot)] = name
+                if not in_flight:
+                    break
+                # Each render enforces PDF_RENDER_TIMEOUT itself and fails
+                # with RenderTimeout, which is listed like any other error.
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = in_flight.pop(future)
+                    try:
+                        archive.writestr(name, future.result())
+                    except Exception as exc:
+                        logger.exception("Cohort export failed for %s", name)
+                        failures.append(f"{name}: {exc}")
+                yield sink.drain()
+            if failures:
+                archive.writestr('errors.txt', '\n'.join(failures))
+        yield sink.drain()
+    finally:
+        # Also reached when the client disconnects mid-download. Queued renders
+        # are dropped; started ones finish (or time out) on their own rather
+        # than taking down the shared renderer's other exports.
+        for future in in_flight:
+            future.cancel()
@@ -0,0 +1,375 @@
+"""
+Streaming catalog importer for companies, question templates and resources.
+
+Rows are read lazily from CSV or NDJSON, validated with the API serializers and
+upserted by natural key in batched transactions. Invalid rows are reported and
+skipped; they never abort the rest of the job.
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework.validators import UniqueValidator
+
+from .models import (
+    CareerResource,
+    Company,
+    CompanyCategory,
+    OptionTemplate,
+    QuestionCategory,
+    QuestionTemplate,
+    ResourceCategory,
+)
+from .search import index_instances
+from .serializers import (
+    CareerResourceCreateSerializer,
+    CompanyCategorySerializer,
+    CompanySerializer,
+    QuestionTemplateCreateSerializer,
+)
+
+FORMATS = ('csv', 'ndjson')
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def detect_format(filename):
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    raise ImportFormatError("Cannot infer format from file name; pass csv or ndjson explicitly.")
+
+
+def iter_rows(stream, fmt):
+    """
+    Yield ``(row_number, data)`` pairs from a text stream without reading it all.
+
+    Rows that cannot be decoded are yielded with a ``str`` error instead of a dict.
+    """
+    if fmt == 'csv':
+        for row_number, row in enumerate(csv.DictReader(stream), start=2):
+            # Blank cells mean "use the default", not "empty string".
+            yield row_number, {key: value for key, value in row.items() if key and value not in ('', None)}
+    elif fmt == 'ndjson':
+        for row_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield row_number, f"Invalid JSON: {exc.msg}"
+                continue
+            if not isinstance(data, dict):
+                yield row_number, "Each line must be a JSON object."
+                continue
+            yield row_number, data
+    else:
+        raise ImportFormatError(f"Unsupported format '{fmt}'. Use one of: {', '.join(FORMATS)}.")
+
+
+class CatalogImporter:
+    """
+    Base upsert pipeline. Subclasses name the model, the serializer used for
+    validation, the natural key and the columns written on update.
+    """
+    model = None
+    serializer_class = None
+    update_fields = ()
+
+    def __init__(self, user=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+        if chunk_size < 1:
+            # islice(rows, 0) would end the import at once and report success.
+            raise ImportFormatError("chunk_size must be at least 1.")
+        self.user = user
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+
+    def natural_key(self, data):
+        raise NotImplementedError
+
+    def existing(self, keys):
+        """Return ``{natural_key: instance}`` for the keys already stored."""
+        raise NotImplementedError
+
+    def prepare(self, rows):
+        """
+        Hook to resolve convenience columns for a whole chunk at once. Rows given
+        an ``_errors`` dict are reported without being validated.
+        """
+        return rows
+
+    def build(self, data):
+        return self.model(**data)
+
+    def apply(self, instance, data):
+        for attr in self.update_fields:
+            if attr in data:
+                setattr(instance, attr, data[attr])
+
+    def write(self, to_create, to_update):
+        self.model.objects.bulk_create(to_create)
+        if to_update:
+            self.model.objects.bulk_update(to_update, self.update_fields)
+
+    def get_serializer(self, data):
+        serializer = self.serializer_class(data=data)
+        # Upserts resolve natural-key collisions themselves.
+        for serializer_field in serializer.fields.values():
+            serializer_field.validators = [
+                validator for validator in serializer_field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return serializer
+
+    def run(self, stream, fmt):
+        result = ImportResult()
+        rows = iter_rows(stream, fmt)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self._import_chunk(chunk, result)
+        return result
+
+    def _import_chunk(self, chunk, result):
+        valid = {}
+        decoded = []
+        for row_number, data in chunk:
+            if isinstance(data, str):
+                result.add_error(row_number, {'non_field_errors': [data]})
+            else:
+                decoded.append((row_number, data))
+
+        for row_number, data in self.prepare(decoded):
+            if '_errors' in data:
+                result.add_error(row_number, data['_errors'])
+                continue
+            serializer = self.get_serializer(data)
+            if not serializer.is_valid():
+                result.add_error(row_number, serializer.errors)
+                continue
+            # Later rows win when a key repeats within the chunk.
+            valid[self.natural_key(serializer.validated_data)] = serializer.validated_data
+
+        if not valid:
+            return
+        with transaction.atomic():
+            existing = self.existing(list(valid))
+            to_create, to_update = [], []
+            for key, data in valid.items():
+                instance = existing.get(key)
+                if instance is None:
+                    to_create.append(self.build(data))
+                    continue
+                self.apply(instance, data)
+                to_update.append(instance)
+            self.write(to_create, to_update)
+            index_instances([*to_create, *to_update])
+            if self.dry_run:
+                transaction.set_rollback(True)
+        result.created += len(to_create)
+        result.updated += len(to_update)
+
+    @staticmethod
+    def resolve_names(rows, model, column, target):
+        """Map a ``<column>`` name cell to the ``<target>`` primary key using one query."""
+        names = {data[column] for _, data in rows if data.get(column)}
+        if not names:
+            return rows
+        ids = dict(model.objects.filter(name__in=names).values_list('name', 'id'))
+        for row_number, data in rows:
+            name = data.pop(column, None)
+            if name is None or target in data:
+                continue
+            if name in ids:
+                data[target] = ids[name]
+            else:
+                data['_errors'] = {column: [f"No {model._meta.verbose_name} named '{name}'."]}
+        return rows
+
+
+class CompanyCategoryImporter(CatalogImporter):
+    model = CompanyCategory
+    serializer_class = CompanyCategorySerializer
+    update_fields = ('description', 'icon', 'is_active', 'order')
+
+    def natural_key(self, data):
+        return data['name']
+
+    def existing(self, keys):
+        return CompanyCategory.objects.in_bulk(keys, field_name='name')
+
+
+class CompanyImporter(CatalogImporter):
+    model = Company
+    serializer_class = CompanySerializer
+    update_fields = ('email', 'website', 'description', 'location', 'industry', 'category', 'is_active')
+
+    def prepare(self, rows):
+        return self.resolve_names(rows, CompanyCategory, 'category_name', 'category_id')
+
+    def natural_key(self, data):
+        # Case-insensitive, like Company.objects.for_names().
+        return data['name'].lower()
+
+    def existing(self, keys):
+        existing = {}
+        for company in (
+            Company.objects.annotate(name_key=Lower('name'))
+            .filter(name_key__in=keys)
+            .order_by('-is_active', 'id')
+        ):
+            existing.setdefault(company.name_key, company)
+        return existing
+
+    def apply(self, instance, data):
+        # Stubs created for unknown recommendation companies have no email
+        # yet; filling one in publishes it unless the row says otherwise.
+        is_stub = not instance.is_active and not instance.email
+        super().apply(instance, data)
+        if is_stub and 'is_active' not in data:
+            instance.is_active = True
+
+
+class QuestionTemplateImporter(CatalogImporter):
+    """
+    Options travel with their template: a JSON list in NDJSON, or a JSON list /
+    ``|``-separated labels in the CSV ``options`` column. Updating a template
+    replaces its options.
+    """
+    model = QuestionTemplate
+    serializer_class = QuestionTemplateCreateSerializer
+    update_fields = ('order', 'is_active')
+
+    def prepare(self, rows):
+        for _, data in rows:
+            options = data.get('options')
+            if isinstance(options, str):
+                if options.lstrip().startswith('['):
+                    try:
+                        data['options'] = json.loads(options)
+                    except json.JSONDecodeError:
+                        pass
+                else:
+                    data['options'] = [
+                        {'label': label.strip(), 'order': order}
+                        for order, label in enumerate(options.split('|'), start=1)
+                        if label.strip()
+                    ]
+        return self.resolve_names(rows, QuestionCategory, 'category_name', 'category')
+
+    def natural_key(self, data):
+        return (data['category'].id, data['prompt'])
+
+    def existing(self, keys):
+        prompts = {prompt for _, prompt in keys}
+        category_ids = {category_id for category_id, _ in keys}
+        return {
+            (template.category_id, template.prompt): template
+            for template in QuestionTemplate.objects.filter(category_id__in=category_ids, prompt__in=prompts)
+        }
+
+    def build(self, data):
+        template = QuestionTemplate(**{key: value for key, value in data.items() if key != 'options'})
+        template._import_options = data['options']
+        return template
+
+    def apply(self, instance, data):
+        super().apply(instance, data)
+        instance._import_options = data['options']
+
+    def write(self, to_create, to_update):
+        QuestionTemplate.objects.bulk_create(to_create)
+        if to_update:
+            QuestionTemplate.objects.bulk_update(to_update, self.update_fields)
+            OptionTemplate.objects.filter(question__in=to_update).delete()
+        OptionTemplate.objects.bulk_create(
+            OptionTemplate(
+                question=template,
+                **{key: value for key, value in option.items() if key != 'id'},
+            )
+            for template in [*to_create, *to_update]
+            for option in template._import_options
+        )
+
+
+class ResourceImporter(CatalogImporter):
+    model = CareerResource
+    serializer_class = CareerResourceCreateSerializer
+    update_fields = (
+        'category',
+        'description',
+        'resource_type',
+        'url',
+        'difficulty_level',
+        'is_free',
+        'cost',
+        'order',
+        'is_active',
+    )
+
+    def prepare(self, rows):
+        for _, data in rows:
+            # Files cannot be streamed through a catalog import.
+            data.pop('file', None)
+        return self.resolve_names(rows, ResourceCategory, 'category_name', 'category')
+
+    def natural_key(self, data):
+        recommendation = data.get('career_recommendation')
+        return (data['title'], recommendation.id if recommendation else None)
+
+    def existing(self, keys):
+        titles = {title for title, _ in keys}
+        existing = {}
+        for resource in CareerResource.objects.filter(title__in=titles).order_by('id'):
+            existing.setdefault((resource.title, resource.career_recommendation_id), resource)
+        return existing
+
+    def build(self, data):
+        return CareerResource(admin=self.user, **data)
+
+
+IMPORTERS = {
+    'company_categories': CompanyCategoryImporter,
+    'companies': CompanyImporter,
+    'question_templates': QuestionTemplateImporter,
+    'resources': ResourceImporter,
+}
+
+
+def import_catalog(kind, stream, fmt, **kwargs):
+    try:
+        importer_class = IMPORTERS[kind]
+    except KeyError:
+        raise ImportFormatError(f"Unknown catalog '{kind}'. Use one of: {', '.join(IMPORTERS)}.")
+    return importer_class(**kwargs).run(stream, fmt)
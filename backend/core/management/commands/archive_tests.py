@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.archival import DEFAULT_BATCH_SIZE, archivable_tests, archive_tests
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold completed tests older than ARCHIVE_TESTS_AFTER_DAYS into compressed snapshots "
+        "and delete their question, option and answer rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=settings.ARCHIVE_TESTS_AFTER_DAYS,
+            help="Archive tests completed more than this many days ago (default: %(default)s).",
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Tests per transaction.")
+        parser.add_argument('--limit', type=int, help="Stop after archiving this many tests.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the tests that would be archived.")
+
+    def handle(self, *args, **options):
+        if options['older_than_days'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--older-than-days must be >= 0 and --batch-size >= 1.")
+        older_than = timezone.now() - timedelta(days=options['older_than_days'])
+
+        if options['dry_run']:
+            count = archivable_tests(older_than).count()
+            self.stdout.write(f"{count} test(s) completed before {older_than:%Y-%m-%d %H:%M} would be archived.")
+            return
+
+        stats = archive_tests(older_than, batch_size=options['batch_size'], limit=options['limit'])
+        if not stats['tests']:
+            self.stdout.write(self.style.SUCCESS("Nothing to archive."))
+            return
+        self.stdout.write(
+            f"Deleted {stats['questions']} question(s), {stats['options']} option(s) "
+            f"and {stats['answers']} answer(s)."
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {stats['tests']} test(s): {stats['raw_bytes']} bytes of JSON "
+            f"stored as {stats['stored_bytes']} bytes."
+        ))
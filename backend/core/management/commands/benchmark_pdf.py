@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import measure_page_numbering, run_render_benchmark
+
+SUITE_COLUMNS = (
+    'steps', 'summary_words', 'pages', 'output_bytes', 'p50_ms', 'p90_ms', 'p99_ms',
+    'pages_per_second', 'tracemalloc_peak_kib', 'peak_rss_kib',
+)
+NUMBERING_COLUMNS = ('steps', 'pages', 'plain_peak_kib', 'numbered_peak_kib', 'numbering_overhead_kib')
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark recommendation PDF rendering on synthetic reports of growing size. "
+        "Use --output to save a JSON report for comparing commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--steps', type=int, nargs='+', default=[5, 20, 80, 320],
+                            help="Roadmap step counts to render.")
+        parser.add_argument('--summary-words', type=int, nargs='+', default=[120, 1200],
+                            help="Summary lengths (in words) to render.")
+        parser.add_argument('--description-words', type=int, default=40, help="Words per roadmap step description.")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed renders per case.")
+        parser.add_argument('--output', help="Write the full report as JSON to this path.")
+        parser.add_argument('--numbering', action='store_true',
+                            help="Only compare memory with and without page numbering.")
+
+    def handle(self, *args, **options):
+        if options['numbering']:
+            self._table(measure_page_numbering(options['steps']), NUMBERING_COLUMNS)
+            return
+
+        report = run_render_benchmark(
+            options['steps'],
+            options['summary_words'],
+            description_words=options['description_words'],
+            repeat=options['repeat'],
+        )
+        self._table(report['cases'], SUITE_COLUMNS)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def _table(self, rows, columns):
+        width = max(len(column) for column in columns)
+        self.stdout.write('  '.join(f'{column:>{width}}' for column in columns))
+        for row in rows:
+            self.stdout.write('  '.join(f'{str(row[column]):>{width}}' for column in columns))
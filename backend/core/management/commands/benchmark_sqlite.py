@@ -0,0 +1,192 @@
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sqlite import pragma_statements
+
+COLUMNS = (
+    'profile', 'reads_per_second', 'writes_per_second', 'locked_errors', 'read_p99_ms', 'write_p99_ms',
+)
+SCHEMA = (
+    'CREATE TABLE test (id INTEGER PRIMARY KEY, answered_count INTEGER NOT NULL DEFAULT 0)',
+    'CREATE TABLE answer (id INTEGER PRIMARY KEY, student_id INTEGER NOT NULL, test_id INTEGER NOT NULL, '
+    'question_id INTEGER NOT NULL, option_id INTEGER NOT NULL, UNIQUE (student_id, test_id, question_id))',
+)
+
+
+def _p99(samples):
+    if len(samples) < 2:
+        return round(samples[0] * 1000, 2) if samples else None
+    return round(statistics.quantiles(samples, n=100)[98] * 1000, 2)
+
+
+class _Workload:
+    """
+    Answer submissions against a throwaway database shaped like core_studentanswer.
+
+    Connections mirror Django's sqlite3 backend: autocommit with explicit BEGIN,
+    Python's default 5 s lock timeout, then the profile's pragmas on top.
+    """
+
+    def __init__(self, path, pragmas, begin, tests, questions):
+        self.path = path
+        self.pragmas = pragmas
+        self.begin = begin
+        self.tests = tests
+        self.questions = questions
+        self.lock = threading.Lock()
+        self.reads, self.writes = [], []
+        self.locked_errors = 0
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        for statement in pragma_statements(self.pragmas):
+            connection.execute(statement)
+        return connection
+
+    def seed(self, rows):
+        connection = self.connect()
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.execute('BEGIN')
+        connection.executemany('INSERT INTO test (id) VALUES (?)', [(test,) for test in range(1, self.tests + 1)])
+        connection.executemany(
+            'INSERT OR IGNORE INTO answer (student_id, test_id, question_id, option_id) VALUES (?, ?, ?, 1)',
+            [(row % self.tests + 1, row % self.tests + 1, row // self.tests) for row in range(rows)],
+        )
+        connection.execute('COMMIT')
+        connection.close()
+
+    def read(self, connection, test):
+        connection.execute('SELECT answered_count FROM test WHERE id = ?', (test,)).fetchone()
+        connection.execute(
+            'SELECT question_id, option_id FROM answer WHERE student_id = ? AND test_id = ?', (test, test)
+        ).fetchall()
+
+    def write(self, connection, test, question):
+        connection.execute(self.begin)
+        try:
+            exists = connection.execute(
+                'SELECT 1 FROM answer WHERE student_id = ? AND test_id = ? AND question_id = ?',
+                (test, test, question),
+            ).fetchone()
+            connection.execute(
+                'INSERT INTO answer (student_id, test_id, question_id, option_id) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (student_id, test_id, question_id) DO UPDATE SET option_id = excluded.option_id',
+                (test, test, question, random.randint(1, 4)),
+            )
+            if not exists:
+                connection.execute('UPDATE test SET answered_count = answered_count + 1 WHERE id = ?', (test,))
+            connection.execute('COMMIT')
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+
+    def worker(self, writer, deadline):
+        connection = self.connect()
+        samples = []
+        errors = 0
+        while time.perf_counter() < deadline:
+            test = random.randint(1, self.tests)
+            started = time.perf_counter()
+            try:
+                if writer:
+                    self.write(connection, test, random.randint(1, self.questions))
+                else:
+                    self.read(connection, test)
+            except sqlite3.OperationalError as exc:
+                if 'locked' not in str(exc) and 'busy' not in str(exc):
+                    raise
+                errors += 1
+                continue
+            samples.append(time.perf_counter() - started)
+        connection.close()
+        with self.lock:
+            (self.writes if writer else self.reads).extend(samples)
+            self.locked_errors += errors
+
+    def run(self, readers, writers, duration):
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=self.worker, args=(writer, deadline))
+            for writer in [False] * readers + [True] * writers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {
+            'reads_per_second': round(len(self.reads) / duration, 1),
+            'writes_per_second': round(len(self.writes) / duration, 1),
+            'locked_errors': self.locked_errors,
+            'read_p99_ms': _p99(self.reads),
+            'write_p99_ms': _p99(self.writes),
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent read/write throughput on SQLite with its default settings and with "
+        "the SQLITE_PRAGMAS profile (plus BEGIN IMMEDIATE), using a throwaway database file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help="Reader threads.")
+        parser.add_argument('--writers', type=int, default=4, help="Writer threads.")
+        parser.add_argument('--duration', type=float, default=5, help="Seconds to run each profile.")
+        parser.add_argument('--rows', type=int, default=50000, help="Answers to seed before measuring.")
+        parser.add_argument('--tests', type=int, default=500, help="Distinct tests the workload spreads over.")
+        parser.add_argument('--directory', help="Where to create the database files (default: a temp dir).")
+        parser.add_argument('--output', help="Write the results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        if not settings.SQLITE_PRAGMAS:
+            raise CommandError("SQLITE_PRAGMAS is empty (SQLITE_TUNING=0); there is no profile to compare.")
+        profiles = (
+            ('default', {}, 'BEGIN'),
+            ('tuned', settings.SQLITE_PRAGMAS, 'BEGIN IMMEDIATE'),
+        )
+        directory = tempfile.mkdtemp(prefix='benchmark_sqlite_', dir=options['directory'])
+        results = []
+        try:
+            for name, pragmas, begin in profiles:
+                workload = _Workload(
+                    os.path.join(directory, f'{name}.sqlite3'),
+                    pragmas,
+                    begin,
+                    tests=options['tests'],
+                    questions=max(options['rows'] // options['tests'], 1) * 2,
+                )
+                workload.seed(options['rows'])
+                results.append({'profile': name, **workload.run(
+                    options['readers'], options['writers'], options['duration'],
+                )})
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        width = max(len(column) for column in COLUMNS)
+        self.stdout.write('  '.join(f'{column:>{width}}' for column in COLUMNS))
+        for row in results:
+            self.stdout.write('  '.join(f'{str(row[column]):>{width}}' for column in COLUMNS))
+        if options['output']:
+            report = {
+                'sqlite_version': sqlite3.sqlite_version,
+                'readers': options['readers'],
+                'writers': options['writers'],
+                'duration': options['duration'],
+                'pragmas': settings.SQLITE_PRAGMAS,
+                'results': results,
+            }
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from core.models import PersonalizedTest, Question, StudentAnswer
+
+
+def _actual(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(personalized_test=OuterRef('id'))
+            .order_by()
+            .values('personalized_test')
+            .annotate(total=Count('id'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = "Compare PersonalizedTest.questions_count/answered_count with the real row counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help="Rewrite drifted counters from the real counts.")
+
+    def handle(self, *args, **options):
+        drifted = (
+            # Archived tests have no rows left; their counters describe the snapshot.
+            PersonalizedTest.objects.filter(archived_at__isnull=True).annotate(
+                actual_questions=_actual(Question),
+                actual_answers=_actual(StudentAnswer),
+            )
+            .exclude(Q(questions_count=F('actual_questions')) & Q(answered_count=F('actual_answers')))
+            .order_by('id')
+            .values_list('id', 'questions_count', 'actual_questions', 'answered_count', 'actual_answers')
+        )
+        rows = list(drifted)
+        for test_id, questions_count, actual_questions, answered_count, actual_answers in rows:
+            self.stdout.write(
+                f"Test {test_id}: questions {questions_count} (actual {actual_questions}), "
+                f"answered {answered_count} (actual {actual_answers})"
+            )
+        if not rows:
+            self.stdout.write(self.style.SUCCESS("All test counters match."))
+            return
+        if not options['repair']:
+            raise CommandError(f"{len(rows)} test(s) have drifted counters; rerun with --repair to fix them.")
+
+        # Recount inside the UPDATE itself so writes since the check are not lost.
+        PersonalizedTest.objects.filter(id__in=[row[0] for row in rows]).update(
+            questions_count=_actual(Question),
+            answered_count=_actual(StudentAnswer),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Repaired {len(rows)} test(s)."))
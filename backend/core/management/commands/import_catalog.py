@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import DEFAULT_CHUNK_SIZE, FORMATS, IMPORTERS, ImportFormatError, detect_format, import_catalog
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or NDJSON catalog file into the database, upserting rows by natural key."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction (at least 1).")
+        parser.add_argument('--admin-email', help="Admin recorded as the creator of imported resources.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and roll back every chunk.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options['admin_email']:
+            try:
+                user = User.objects.get(email=options['admin_email'], role=User.Roles.ADMIN)
+            except User.DoesNotExist:
+                raise CommandError(f"No admin with email {options['admin_email']}.")
+        try:
+            fmt = options['format'] or detect_format(options['path'])
+            with open(options['path'], encoding='utf-8', newline='') as stream:
+                result = import_catalog(
+                    options['kind'],
+                    stream,
+                    fmt,
+                    user=user,
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run'],
+                )
+        except (ImportFormatError, OSError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... {result.error_count - len(result.errors)} more errors not shown.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result.created}, updated {result.updated}, rejected {result.error_count} rows."
+        ))
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+BOOT_SCRIPT = (
+    "import importlib, django; django.setup(); "
+    "from django.conf import settings; importlib.import_module(settings.ROOT_URLCONF)"
+)
+
+
+def parse_importtime(stderr):
+    """Return ``[(module, self_us, cumulative_us)]`` from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # The header line.
+        rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Report what a web worker imports at boot (Django setup plus the URLconf), "
+        "using python -X importtime in a fresh interpreter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help="Rows to show.")
+        parser.add_argument('--by-package', action='store_true',
+                            help="Sum self time per top-level package instead of listing modules.")
+        parser.add_argument('--forbid', nargs='+', default=[], metavar='PACKAGE',
+                            help="Fail if any of these top-level packages is imported at boot.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'career_backend.settings'))
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode:
+            raise CommandError(f"Boot failed:\n{completed.stderr[-2000:]}")
+
+        rows = parse_importtime(completed.stderr)
+        # Cumulative times nest, so the boot total is the sum of self times.
+        total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+        packages = defaultdict(int)
+        for module, self_us, _ in rows:
+            packages[module.split('.')[0]] += self_us
+
+        if options['by_package']:
+            self.stdout.write(f"{'self ms':>10}  package")
+            for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['limit']]:
+                self.stdout.write(f"{self_us / 1000:>10.1f}  {package}")
+        else:
+            self.stdout.write(f"{'self ms':>10}  {'cumul ms':>10}  module")
+            for module, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[:options['limit']]:
+                self.stdout.write(f"{self_us / 1000:>10.1f}  {cumulative_us / 1000:>10.1f}  {module}")
+        self.stdout.write(f"\n{len(rows)} modules, {total_ms:.1f} ms total import time.")
+
+        loaded = sorted(package for package in options['forbid'] if package in packages)
+        if loaded:
+            raise CommandError(f"Imported at boot: {', '.join(loaded)}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-create every full-text search document. Needed after bulk queryset updates, "
+        "which bypass the signals that keep the index current."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} documents."))
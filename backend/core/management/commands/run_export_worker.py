@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.exports import prune_pdf_cache, run_worker
+from core.rendering import get_renderer, reset_renderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Render queued recommendation PDF export jobs. Worker threads claim jobs and "
+        "hand the rendering to the PDF_RENDER_BACKEND."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.PDF_RENDER_WORKERS)
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--stale-minutes', type=int, default=10,
+                            help="Requeue running jobs older than this, checked every minute (their worker is "
+                                 "assumed dead). Never less than twice PDF_RENDER_TIMEOUT.")
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty.")
+
+    def handle(self, *args, **options):
+        removed = prune_pdf_cache(timedelta(hours=settings.PDF_CACHE_MAX_AGE_HOURS))
+        if removed:
+            self.stdout.write(f"Pruned {removed} cached PDF(s).")
+        renderer = get_renderer()
+        self.stdout.write(f"Starting {options['workers']} export worker(s) on the {renderer.backend} backend.")
+        try:
+            run_worker(
+                workers=options['workers'],
+                poll_interval=options['poll_interval'],
+                once=options['once'],
+                stale_after=timedelta(minutes=options['stale_minutes']),
+            )
+        finally:
+            reset_renderer()
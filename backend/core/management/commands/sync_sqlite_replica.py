@@ -0,0 +1,29 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary into the SQLite replica files with the online backup API. "
+        "SQLite has no replication; this stands in for it when trying the replica router locally."
+    )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if not settings.READ_REPLICAS:
+            raise CommandError("No replica configured; set SQLITE_REPLICA_NAME.")
+        for alias in settings.READ_REPLICAS:
+            replica = settings.DATABASES[alias]
+            if 'sqlite3' not in primary['ENGINE'] or 'sqlite3' not in replica['ENGINE']:
+                raise CommandError(f"{alias}: only SQLite primaries and replicas can be synced this way.")
+            source = sqlite3.connect(primary['NAME'])
+            target = sqlite3.connect(replica['NAME'])
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(self.style.SUCCESS(f"Copied {primary['NAME']} to {replica['NAME']} ({alias})."))
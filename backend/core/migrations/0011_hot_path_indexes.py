@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_recommendationexportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='careerrecommendation',
+            index=models.Index(fields=['-created_at'], name='recommendation_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='careerresource',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'created_at'], name='resource_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'name'], name='company_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personalizedtest',
+            index=models.Index(fields=['status', '-completed_at'], name='test_status_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questiontemplate',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'order', 'id'], name='template_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testrequest',
+            index=models.Index(fields=['status', '-created_at'], name='request_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testrequest',
+            index=models.Index(fields=['student', '-created_at'], name='request_student_created_idx'),
+        ),
+    ]
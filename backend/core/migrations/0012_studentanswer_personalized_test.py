@@ -0,0 +1,35 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_personalized_test(apps, schema_editor):
+    StudentAnswer = apps.get_model('core', 'StudentAnswer')
+    Question = apps.get_model('core', 'Question')
+    StudentAnswer.objects.using(schema_editor.connection.alias).filter(personalized_test__isnull=True).update(
+        personalized_test=Subquery(
+            Question.objects.filter(id=OuterRef('question_id')).values('personalized_test_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentanswer',
+            name='personalized_test',
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='answers',
+                to='core.personalizedtest',
+            ),
+        ),
+        migrations.RunPython(backfill_personalized_test, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+COMPOSITE_FK = 'answer_question_test_fk'
+
+
+def add_composite_foreign_key(apps, schema_editor):
+    # SQLite cannot add constraints to an existing table; there the model's
+    # save() is what keeps the copy in step with the question.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE core_studentanswer ADD CONSTRAINT {COMPOSITE_FK} '
+        'FOREIGN KEY (question_id, personalized_test_id) '
+        'REFERENCES core_question (id, personalized_test_id) DEFERRABLE INITIALLY DEFERRED'
+    )
+
+
+def drop_composite_foreign_key(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'ALTER TABLE core_studentanswer DROP CONSTRAINT IF EXISTS {COMPOSITE_FK}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_studentanswer_personalized_test'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentanswer',
+            name='personalized_test',
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='answers',
+                to='core.personalizedtest',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='question',
+            constraint=models.UniqueConstraint(fields=('id', 'personalized_test'), name='question_id_test_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='studentanswer',
+            constraint=models.UniqueConstraint(
+                fields=('student', 'personalized_test', 'question'),
+                name='answer_student_test_question_uniq',
+            ),
+        ),
+        migrations.RunPython(add_composite_foreign_key, drop_composite_foreign_key),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('id')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('id'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    PersonalizedTest = apps.get_model('core', 'PersonalizedTest')
+    Question = apps.get_model('core', 'Question')
+    StudentAnswer = apps.get_model('core', 'StudentAnswer')
+    PersonalizedTest.objects.using(schema_editor.connection.alias).update(
+        questions_count=_count(Question, 'personalized_test'),
+        answered_count=_count(StudentAnswer, 'personalized_test'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_studentanswer_test_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personalizedtest',
+            name='questions_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='personalizedtest',
+            name='answered_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,108 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def link_companies(apps, schema_editor):
+    """Match each line of the old text field to a Company, stubbing unknown names."""
+    db = schema_editor.connection.alias
+    CareerRecommendation = apps.get_model('core', 'CareerRecommendation')
+    Company = apps.get_model('core', 'Company')
+    RecommendationCompany = apps.get_model('core', 'RecommendationCompany')
+
+    recommendations = []
+    wanted = {}
+    for recommendation_id, text in CareerRecommendation.objects.using(db).exclude(companies_text='').values_list(
+        'id', 'companies_text'
+    ):
+        keys = []
+        for line in text.split('\n'):
+            name = line.strip()
+            if name and name.lower() not in keys:
+                keys.append(name.lower())
+                wanted.setdefault(name.lower(), name)
+        recommendations.append((recommendation_id, keys))
+    if not wanted:
+        return
+
+    companies = {}
+    for company in (
+        Company.objects.using(db).annotate(name_key=Lower('name')).filter(name_key__in=list(wanted))
+        .order_by('-is_active', 'id')
+    ):
+        companies.setdefault(company.name_key, company.id)
+    missing = [key for key in wanted if key not in companies]
+    stubs = Company.objects.using(db).bulk_create(Company(name=wanted[key], is_active=False) for key in missing)
+    companies.update((key, stub.id) for key, stub in zip(missing, stubs))
+
+    RecommendationCompany.objects.using(db).bulk_create(
+        (
+            RecommendationCompany(recommendation_id=recommendation_id, company_id=companies[key], order=order)
+            for recommendation_id, keys in recommendations
+            for order, key in enumerate(keys, start=1)
+        ),
+        batch_size=1000,
+    )
+
+
+def unlink_companies(apps, schema_editor):
+    db = schema_editor.connection.alias
+    CareerRecommendation = apps.get_model('core', 'CareerRecommendation')
+    RecommendationCompany = apps.get_model('core', 'RecommendationCompany')
+    names = {}
+    for recommendation_id, name in RecommendationCompany.objects.using(db).order_by(
+        'recommendation_id', 'order'
+    ).values_list('recommendation_id', 'company__name'):
+        names.setdefault(recommendation_id, []).append(name)
+    for recommendation_id, lines in names.items():
+        CareerRecommendation.objects.using(db).filter(id=recommendation_id).update(companies_text='\n'.join(lines))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_personalizedtest_progress_counters'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='careerrecommendation',
+            old_name='companies',
+            new_name='companies_text',
+        ),
+        migrations.CreateModel(
+            name='RecommendationCompany',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.PositiveIntegerField()),
+                ('company', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='recommendation_links',
+                    to='core.company',
+                )),
+                ('recommendation', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='company_links',
+                    to='core.careerrecommendation',
+                )),
+            ],
+            options={
+                'ordering': ['order'],
+                'constraints': [
+                    models.UniqueConstraint(fields=('recommendation', 'company'), name='recommendation_company_uniq'),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name='careerrecommendation',
+            name='companies',
+            field=models.ManyToManyField(
+                blank=True,
+                help_text='Companies that offer this career',
+                related_name='recommendations',
+                through='core.RecommendationCompany',
+                to='core.company',
+            ),
+        ),
+        migrations.RunPython(link_companies, unlink_companies),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_recommendationcompany'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='careerrecommendation',
+            name='companies_text',
+        ),
+    ]
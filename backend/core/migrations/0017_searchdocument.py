@@ -0,0 +1,115 @@
+from django.db import migrations, models
+
+SQLITE_INDEX = (
+    "CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5("
+    "title, body, content='core_searchdocument', content_rowid='id', tokenize='porter unicode61', prefix='2 3')",
+    "CREATE TRIGGER core_searchdocument_fts_insert AFTER INSERT ON core_searchdocument BEGIN "
+    "INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER core_searchdocument_fts_delete AFTER DELETE ON core_searchdocument BEGIN "
+    "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER core_searchdocument_fts_update AFTER UPDATE ON core_searchdocument BEGIN "
+    "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+)
+SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_update",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_delete",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_insert",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+)
+POSTGRESQL_INDEX = (
+    "ALTER TABLE core_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')) STORED",
+    "CREATE INDEX search_document_vector_idx ON core_searchdocument USING GIN (search_vector)",
+)
+POSTGRESQL_DROP = (
+    "DROP INDEX IF EXISTS search_document_vector_idx",
+    "ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS search_vector",
+)
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRESQL_INDEX})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRESQL_DROP})
+
+
+def _text(*parts):
+    return '\n'.join(part for part in parts if part)
+
+
+def index_existing_rows(apps, schema_editor):
+    db = schema_editor.connection.alias
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    sources = (
+        ('resource', apps.get_model('core', 'CareerResource').objects.using(db), lambda row: {
+            'title': row.title, 'body': row.description, 'category_id': row.category_id,
+            'resource_type': row.resource_type, 'difficulty_level': row.difficulty_level,
+            'recommendation_id': row.career_recommendation_id,
+        }),
+        ('company', apps.get_model('core', 'Company').objects.using(db), lambda row: {
+            'title': row.name, 'body': _text(row.description, row.industry, row.location, row.email),
+            'category_id': row.category_id,
+        }),
+        ('job', apps.get_model('core', 'JobRecommendation').objects.using(db).select_related('company'), lambda row: {
+            'title': row.job_title, 'body': _text(row.company.name, row.job_description, row.requirements),
+            'category_id': row.company.category_id, 'recommendation_id': row.career_recommendation_id,
+        }),
+        ('question_template', apps.get_model('core', 'QuestionTemplate').objects.using(db), lambda row: {
+            'title': row.prompt, 'category_id': row.category_id,
+        }),
+    )
+    for kind, rows, build in sources:
+        SearchDocument.objects.using(db).bulk_create(
+            (
+                SearchDocument(kind=kind, object_id=row.pk, is_active=row.is_active, **build(row))
+                for row in rows.iterator(chunk_size=500)
+            ),
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_remove_careerrecommendation_companies_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[
+                    ('resource', 'Resource'),
+                    ('company', 'Company'),
+                    ('job', 'Job'),
+                    ('question_template', 'Question template'),
+                ], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.TextField()),
+                ('body', models.TextField(blank=True)),
+                ('category_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('resource_type', models.CharField(blank=True, max_length=20)),
+                ('difficulty_level', models.CharField(blank=True, max_length=20)),
+                ('recommendation_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_uniq'),
+                ],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(index_existing_rows, migrations.RunPython.noop),
+    ]
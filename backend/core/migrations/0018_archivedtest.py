@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTest',
+            fields=[
+                ('personalized_test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archive', serialize=False, to='core.personalizedtest')),
+                ('format_version', models.PositiveSmallIntegerField()),
+                ('snapshot', models.BinaryField()),
+                ('raw_size', models.PositiveIntegerField(help_text='Size of the uncompressed JSON in bytes.')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='personalizedtest',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
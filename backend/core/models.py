@@ -1,6 +1,9 @@
+from collections import Counter
+
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 
 
 class UserManager(BaseUserManager):
@@ -69,6 +72,14 @@ class TestRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Admin queues and dashboard: filter by status, newest first.
+            models.Index(fields=['status', '-created_at'], name='request_status_created_idx'),
+            # A student's own requests, newest first.
+            models.Index(fields=['student', '-created_at'], name='request_student_created_idx'),
+        ]
+
     def __str__(self):
         return f"Request {self.id} by {self.student.email}"
 
@@ -84,11 +95,47 @@ class PersonalizedTest(models.Model):
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.DRAFT)
     assigned_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # Maintained with F() updates by QuestionManager and core.signals;
+    # `manage.py check_test_counters --repair` fixes any drift.
+    questions_count = models.PositiveIntegerField(default=0, editable=False)
+    answered_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set once core.archival has moved the questions and answers into an ArchivedTest.
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-completed_at'], name='test_status_completed_idx'),
+        ]
 
     def __str__(self):
         return f"Personalized test for {self.request.student.email}"
 
 
+class QuestionManager(models.Manager):
+    def bulk_create_with_options(self, questions):
+        """
+        Insert questions and their options with two bulk INSERTs in one transaction.
+
+        ``questions`` is a list of ``(question, options)`` pairs of unsaved instances;
+        each option is attached to the primary key returned for its question.
+        """
+        with transaction.atomic(using=self.db):
+            created = self.bulk_create([question for question, _ in questions])
+            options = []
+            for question, (_, question_options) in zip(created, questions):
+                for option in question_options:
+                    option.question = question
+                    options.append(option)
+            Option.objects.using(self.db).bulk_create(options)
+            # bulk_create sends no post_save, so count the new questions here.
+            added = Counter(question.personalized_test_id for question in created)
+            for test_id, count in added.items():
+                PersonalizedTest.objects.using(self.db).filter(id=test_id).update(
+                    questions_count=models.F('questions_count') + count
+                )
+        return created
+
+
 class Question(models.Model):
     personalized_test = models.ForeignKey(PersonalizedTest, on_delete=models.CASCADE, related_name='questions')
     template = models.ForeignKey(
@@ -102,8 +149,15 @@ class Question(models.Model):
     prompt = models.TextField()
     order = models.PositiveIntegerField(default=0)
 
+    objects = QuestionManager()
+
     class Meta:
         ordering = ['order']
+        constraints = [
+            # Target of the composite foreign key that keeps
+            # StudentAnswer.personalized_test in step with its question.
+            models.UniqueConstraint(fields=['id', 'personalized_test'], name='question_id_test_uniq'),
+        ]
 
     def __str__(self):
         return f"Question {self.order} for test {self.personalized_test_id}"
@@ -124,28 +178,88 @@ class Option(models.Model):
 
 class StudentAnswer(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='answers')
+    # Copy of question.personalized_test so per-test lookups skip the join.
+    personalized_test = models.ForeignKey(
+        PersonalizedTest,
+        on_delete=models.CASCADE,
+        related_name='answers',
+        editable=False,
+    )
     option = models.ForeignKey(Option, on_delete=models.CASCADE, related_name='answers')
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='answers')
     submitted_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ('question', 'student')
+        constraints = [
+            # Serves "answers by this student in this test" as an index-only scan.
+            models.UniqueConstraint(
+                fields=['student', 'personalized_test', 'question'],
+                name='answer_student_test_question_uniq',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.personalized_test_id is None:
+            self.personalized_test_id = self.question.personalized_test_id
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Answer by {self.student.email} to question {self.question_id}"
 
 
+class ArchivedTest(models.Model):
+    """
+    Questions, options and answers of an old completed test as one
+    zlib-compressed JSON document; see core.archival for the format.
+    """
+    personalized_test = models.OneToOneField(
+        PersonalizedTest,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='archive',
+    )
+    format_version = models.PositiveSmallIntegerField()
+    snapshot = models.BinaryField()
+    raw_size = models.PositiveIntegerField(help_text="Size of the uncompressed JSON in bytes.")
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archive of test {self.personalized_test_id}"
+
+
 class CareerRecommendation(models.Model):
     personalized_test = models.OneToOneField(PersonalizedTest, on_delete=models.CASCADE, related_name='recommendation')
     admin = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='recommendations')
     career_name = models.CharField(max_length=255)
     summary = models.TextField()
-    companies = models.TextField(blank=True, help_text="List of companies (one per line) that offer this career")
+    companies = models.ManyToManyField(
+        'Company',
+        through='RecommendationCompany',
+        related_name='recommendations',
+        blank=True,
+        help_text="Companies that offer this career",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='recommendation_created_idx'),
+        ]
+
     def __str__(self):
         return f"Recommendation for {self.personalized_test.request.student.email}"
 
+    def set_companies(self, names):
+        """Replace the linked companies with ``names``, keeping their order."""
+        companies = Company.objects.for_names(names)
+        with transaction.atomic():
+            self.company_links.all().delete()
+            RecommendationCompany.objects.bulk_create(
+                RecommendationCompany(recommendation=self, company=company, order=order)
+                for order, company in enumerate(companies, start=1)
+            )
+
 
 class RoadmapStep(models.Model):
     recommendation = models.ForeignKey(CareerRecommendation, on_delete=models.CASCADE, related_name='steps')
@@ -220,6 +334,12 @@ class CareerResource(models.Model):
         indexes = [
             models.Index(fields=['career_recommendation', 'is_active']),
             models.Index(fields=['category', 'is_active']),
+            # Listings only ever show active resources, in display order.
+            models.Index(
+                fields=['order', 'created_at'],
+                condition=models.Q(is_active=True),
+                name='resource_active_order_idx',
+            ),
         ]
 
     def __str__(self):
@@ -291,6 +411,13 @@ class QuestionTemplate(models.Model):
 
     class Meta:
         ordering = ["order", "id"]
+        indexes = [
+            models.Index(
+                fields=["category", "order", "id"],
+                condition=models.Q(is_active=True),
+                name="template_active_order_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.category.name} · {self.prompt[:40]}..."
@@ -333,6 +460,35 @@ class CompanyCategory(models.Model):
         return self.name
 
 
+class CompanyManager(models.Manager):
+    def for_names(self, names):
+        """
+        Companies for ``names`` in the same order, matched case-insensitively
+        (active rows first). Names with no match get an inactive stub for an
+        admin to fill in later.
+        """
+        wanted = {}
+        for name in names:
+            name = name.strip()
+            if name:
+                wanted.setdefault(name.lower(), name)
+        found = {}
+        for company in (
+            self.annotate(name_key=Lower('name'))
+            .filter(name_key__in=list(wanted))
+            .order_by('-is_active', 'id')
+        ):
+            found.setdefault(company.name_key, company)
+        missing = [key for key in wanted if key not in found]
+        if missing:
+            from .search import index_instances
+
+            stubs = self.bulk_create(self.model(name=wanted[key], is_active=False) for key in missing)
+            index_instances(stubs)  # bulk_create sends no post_save.
+            found.update(zip(missing, stubs))
+        return [found[key] for key in wanted]
+
+
 class Company(models.Model):
     """Company information that can be recommended to students"""
     name = models.CharField(max_length=255)
@@ -353,14 +509,39 @@ class Company(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CompanyManager()
+
     class Meta:
         verbose_name_plural = "Companies"
         ordering = ['category', 'name']
+        indexes = [
+            models.Index(
+                fields=['category', 'name'],
+                condition=models.Q(is_active=True),
+                name='company_active_name_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class RecommendationCompany(models.Model):
+    """A company listed on a recommendation, in the order the admin chose."""
+    recommendation = models.ForeignKey(CareerRecommendation, on_delete=models.CASCADE, related_name='company_links')
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='recommendation_links')
+    order = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['order']
+        constraints = [
+            models.UniqueConstraint(fields=['recommendation', 'company'], name='recommendation_company_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.company} on recommendation {self.recommendation_id}"
+
+
 class JobRecommendation(models.Model):
     """Job positions recommended for students based on their career recommendation"""
     career_recommendation = models.ForeignKey(
@@ -403,3 +584,86 @@ class JobRecommendation(models.Model):
 
     def __str__(self):
         return f"{self.job_title} at {self.company.name}"
+
+
+class RecommendationExportJob(models.Model):
+    """Background PDF render of a career recommendation, polled by the student."""
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+
+    recommendation = models.ForeignKey(
+        CareerRecommendation,
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+    )
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='export_jobs',
+    )
+    fingerprint = models.CharField(
+        max_length=64,
+        help_text="Hash of the rendered content; requests for unchanged content reuse the same job.",
+    )
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField(upload_to='exports/', blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recommendation', 'fingerprint'],
+                condition=~models.Q(status='failed'),
+                name='unique_live_export_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Export job {self.id} for recommendation {self.recommendation_id} ({self.status})"
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of a resource, company, job or question template, kept in
+    step by core.signals. The full-text index itself lives outside the ORM (an
+    FTS5 table on SQLite, a generated tsvector column on PostgreSQL; see
+    core.search), so migrations that rebuild this table must recreate it.
+    """
+
+    class Kind(models.TextChoices):
+        RESOURCE = 'resource', 'Resource'
+        COMPANY = 'company', 'Company'
+        JOB = 'job', 'Job'
+        QUESTION_TEMPLATE = 'question_template', 'Question template'
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+    title = models.TextField()
+    body = models.TextField(blank=True)
+    # Filter columns; category_id refers to the category model of each kind.
+    category_id = models.PositiveBigIntegerField(null=True, blank=True)
+    resource_type = models.CharField(max_length=20, blank=True)
+    difficulty_level = models.CharField(max_length=20, blank=True)
+    recommendation_id = models.PositiveBigIntegerField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='search_document_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id}"
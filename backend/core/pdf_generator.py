@@ -2,7 +2,10 @@
 PDF Generator for Career Recommendations
 Premium design with professional styling and visual appeal
 """
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from hashlib import md5
 from io import BytesIO
 
 from reportlab.lib import colors
@@ -21,159 +24,146 @@ from reportlab.platypus import (
 )
 from reportlab.platypus.flowables import HRFlowable
 
+from .report_snapshot import DEFAULT_THEME, PdfTheme, build_render_snapshot, snapshot_fingerprint
 
-class NumberedCanvas(canvas.Canvas):
-    """Custom canvas for page numbers and header/footer"""
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self.pages = []
-
-    def showPage(self):
-        self.pages.append(dict(self.__dict__))
-        self._startPage()
 
-    def save(self):
-        page_count = len(self.pages)
-        for page in self.pages:
-            self.__dict__.update(page)
-            self.draw_page_number(page_count)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
-    def draw_page_number(self, page_count):
-        self.saveState()
-        self.setFont("Helvetica", 9)
-        self.setFillColor(colors.HexColor('#94A3B8'))
-        page_text = f"Page {self._pageNumber} of {page_count}"
-        self.drawRightString(7.5 * inch, 0.5 * inch, page_text)
-        self.restoreState()
+@dataclass(frozen=True)
+class StyleCatalog:
+    """Paragraph and table styles shared by every render. Treat as read-only."""
+    theme: PdfTheme
+    empty: ParagraphStyle
+    hero_title: ParagraphStyle
+    hero_subtitle: ParagraphStyle
+    section_title: ParagraphStyle
+    career_name: ParagraphStyle
+    subsection: ParagraphStyle
+    body: ParagraphStyle
+    label: ParagraphStyle
+    value: ParagraphStyle
+    step_number: ParagraphStyle
+    step_title: ParagraphStyle
+    step_desc: ParagraphStyle
+    footer: ParagraphStyle
+    top_border_table: TableStyle
+    hero_table: TableStyle
+    student_card_table: TableStyle
+    career_hero_table: TableStyle
+    why_section_table: TableStyle
+    step_number_table: TableStyle
+    step_content_table: TableStyle
+    step_row_table: TableStyle
+    connector_table: TableStyle
 
 
-def generate_recommendation_pdf(recommendation, student):
+@lru_cache(maxsize=None)
+def get_style_catalog(theme=DEFAULT_THEME):
     """
-    Generate a premium, visually stunning PDF for career recommendation
-    
-    Args:
-        recommendation: CareerRecommendation instance
-        student: User instance (student)
-    
-    Returns:
-        BytesIO buffer containing PDF data
+    Build the style catalog once per process and theme.
+
+    Only styles are shared: ReportLab flowables keep layout state from
+    ``wrap``/``split``, so they are still created per document.
     """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        rightMargin=0.5 * inch,
-        leftMargin=0.5 * inch,
-        topMargin=0.6 * inch,
-        bottomMargin=0.6 * inch,
-    )
-    
-    # Use custom canvas for page numbers
-    doc.canvmaker = NumberedCanvas
-    
-    elements = []
     styles = getSampleStyleSheet()
-    
+    c = colors.HexColor
+
     # ========== PREMIUM TYPOGRAPHY STYLES ==========
-    
+
     # Hero Title Style - Large, bold, elegant
     hero_title_style = ParagraphStyle(
         'HeroTitle',
         parent=styles['Heading1'],
         fontSize=42,
-        textColor=colors.HexColor('#0F172A'),  # Deep slate
+        textColor=c(theme.ink),
         spaceAfter=8,
         alignment=1,  # Center
         fontName='Helvetica-Bold',
         leading=48,
     )
-    
+
     # Subtitle Style - Elegant and refined
     hero_subtitle_style = ParagraphStyle(
         'HeroSubtitle',
         parent=styles['Normal'],
         fontSize=13,
-        textColor=colors.HexColor('#64748B'),
+        textColor=c(theme.muted),
         spaceAfter=40,
         alignment=1,
         fontName='Helvetica',
         letterSpacing=2,
         textTransform='uppercase',
     )
-    
+
     # Section Title - Bold and prominent
     section_title_style = ParagraphStyle(
         'SectionTitle',
         parent=styles['Heading1'],
         fontSize=24,
-        textColor=colors.HexColor('#1E293B'),
+        textColor=c(theme.heading),
         spaceAfter=20,
         spaceBefore=30,
         fontName='Helvetica-Bold',
         leading=28,
     )
-    
+
     # Career Name - Large, impactful
     career_name_style = ParagraphStyle(
         'CareerName',
         parent=styles['Heading1'],
         fontSize=36,
-        textColor=colors.HexColor('#4F46E5'),  # Brand indigo
+        textColor=c(theme.brand),
         spaceAfter=25,
         fontName='Helvetica-Bold',
         leading=42,
         alignment=1,
     )
-    
+
     # Subsection Header
     subsection_style = ParagraphStyle(
         'Subsection',
         parent=styles['Heading2'],
         fontSize=16,
-        textColor=colors.HexColor('#334155'),
+        textColor=c(theme.subheading),
         spaceAfter=12,
         spaceBefore=20,
         fontName='Helvetica-Bold',
         leading=20,
     )
-    
+
     # Body Text - Readable and elegant
     body_style = ParagraphStyle(
         'BodyText',
         parent=styles['Normal'],
         fontSize=11,
-        textColor=colors.HexColor('#475569'),
+        textColor=c(theme.body),
         spaceAfter=14,
         leading=18,
         fontName='Helvetica',
         alignment=4,  # Justify
     )
-    
+
     # Info Label Style
     label_style = ParagraphStyle(
         'Label',
         parent=styles['Normal'],
         fontSize=9,
-        textColor=colors.HexColor('#64748B'),
+        textColor=c(theme.muted),
         spaceAfter=4,
         fontName='Helvetica',
         textTransform='uppercase',
         letterSpacing=1,
     )
-    
+
     # Info Value Style
     value_style = ParagraphStyle(
         'Value',
         parent=styles['Normal'],
         fontSize=12,
-        textColor=colors.HexColor('#0F172A'),
+        textColor=c(theme.ink),
         spaceAfter=16,
         fontName='Helvetica-Bold',
         leading=16,
     )
-    
+
     # Step Number Style
     step_number_style = ParagraphStyle(
         'StepNumber',
@@ -183,136 +173,327 @@ def generate_recommendation_pdf(recommendation, student):
         fontName='Helvetica-Bold',
         alignment=1,
     )
-    
+
     # Step Title Style
     step_title_style = ParagraphStyle(
         'StepTitle',
         parent=styles['Heading2'],
         fontSize=16,
-        textColor=colors.HexColor('#1E293B'),
+        textColor=c(theme.heading),
         spaceAfter=8,
         fontName='Helvetica-Bold',
         leading=20,
     )
-    
+
     # Step Description Style
     step_desc_style = ParagraphStyle(
         'StepDesc',
         parent=styles['Normal'],
         fontSize=10,
-        textColor=colors.HexColor('#475569'),
+        textColor=c(theme.body),
         spaceAfter=0,
         leading=16,
         fontName='Helvetica',
     )
-    
+
     # Footer Style
     footer_style = ParagraphStyle(
         'Footer',
         parent=styles['Normal'],
         fontSize=8,
-        textColor=colors.HexColor('#94A3B8'),
+        textColor=c(theme.faint),
         alignment=1,
         fontName='Helvetica-Oblique',
     )
+
+    # ========== TABLE STYLES ==========
+
+    return StyleCatalog(
+        theme=theme,
+        empty=ParagraphStyle('Empty', fontSize=1),
+        hero_title=hero_title_style,
+        hero_subtitle=hero_subtitle_style,
+        section_title=section_title_style,
+        career_name=career_name_style,
+        subsection=subsection_style,
+        body=body_style,
+        label=label_style,
+        value=value_style,
+        step_number=step_number_style,
+        step_title=step_title_style,
+        step_desc=step_desc_style,
+        footer=footer_style,
+        # Decorative top border
+        top_border_table=TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), c(theme.brand)),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+        hero_table=TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ]),
+        student_card_table=TableStyle([
+            # Header row
+            ('BACKGROUND', (0, 0), (-1, 0), c(theme.heading)),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 14),
+            ('TOPPADDING', (0, 0), (-1, 0), 14),
+            ('LEFTPADDING', (0, 0), (-1, 0), 20),
+            ('RIGHTPADDING', (0, 0), (-1, 0), 20),
+            # Data rows
+            ('BACKGROUND', (0, 1), (0, -1), c(theme.surface)),
+            ('BACKGROUND', (1, 1), (1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), c(theme.ink)),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 1), (-1, -1), 20),
+            ('RIGHTPADDING', (0, 1), (-1, -1), 20),
+            ('TOPPADDING', (0, 1), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 12),
+            # Borders
+            ('BOX', (0, 0), (-1, -1), 1.5, c(theme.border)),
+            ('LINEBELOW', (0, 0), (-1, 0), 2, c(theme.brand)),
+            ('LINEBELOW', (0, 1), (-1, -2), 0.5, c(theme.rule)),
+        ]),
+        career_hero_table=TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BACKGROUND', (0, 1), (-1, -1), c(theme.surface)),
+            ('LEFTPADDING', (0, 0), (-1, -1), 30),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 30),
+            ('TOPPADDING', (0, 1), (-1, -1), 25),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 25),
+            ('BOX', (0, 0), (-1, -1), 0, c(theme.border)),
+        ]),
+        why_section_table=TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('BACKGROUND', (0, 1), (-1, -1), c(theme.paper)),
+            ('LEFTPADDING', (0, 0), (-1, -1), 25),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 25),
+            ('TOPPADDING', (0, 0), (-1, -1), 20),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 25),
+            ('BOX', (0, 0), (-1, -1), 1, c(theme.border)),
+            ('LINEBELOW', (0, 0), (-1, 0), 3, c(theme.brand)),
+            ('BACKGROUND', (0, 0), (-1, 0), c(theme.surface)),
+        ]),
+        step_number_table=TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), c(theme.brand)),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('BOX', (0, 0), (-1, -1), 0, c(theme.brand)),
+        ]),
+        step_content_table=TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 20),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 20),
+            ('TOPPADDING', (0, 0), (-1, -1), 15),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+        ]),
+        step_row_table=TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('BACKGROUND', (1, 0), (1, -1), colors.white),
+            ('BOX', (0, 0), (-1, -1), 1, c(theme.border)),
+            ('LINELEFT', (1, 0), (1, -1), 2, c(theme.brand)),
+        ]),
+        # Vertical connector line
+        connector_table=TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), c(theme.brand)),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ]),
+    )
+
+
+class NumberedCanvas(canvas.Canvas):
+    """
+    Custom canvas for "Page N of M" footers.
+
+    Each page references a per-page form XObject that is only filled in on
+    save(), once the total is known, so pages are flushed as they are finished
+    instead of keeping a snapshot of the canvas state for every page.
+    """
+
+    def __init__(self, *args, theme=DEFAULT_THEME, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.theme = theme
+
+    def showPage(self):
+        self.doForm(self._page_number_form(self._pageNumber))
+        canvas.Canvas.showPage(self)
+
+    def save(self):
+        page_count = self._pageNumber - 1
+        for page_number in range(1, page_count + 1):
+            self.beginForm(self._page_number_form(page_number))
+            self.draw_page_number(page_number, page_count)
+            self.endForm()
+        canvas.Canvas.save(self)
+
+    @staticmethod
+    def _page_number_form(page_number):
+        return f"pageNumber{page_number}"
+
+    def draw_page_number(self, page_number, page_count):
+        self.saveState()
+        self.setFont("Helvetica", 9)
+        self.setFillColor(colors.HexColor(self.theme.faint))
+        page_text = f"Page {page_number} of {page_count}"
+        self.drawRightString(7.5 * inch, 0.5 * inch, page_text)
+        self.restoreState()
+
+
+class _FixedTimeStamp:
+    """Stands in for ReportLab's TimeStamp so CreationDate/ModDate are a given UTC moment."""
+
+    def __init__(self, moment):
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc)
+        self.t = moment.replace(tzinfo=timezone.utc).timestamp()
+        self.YMDhms = moment.timetuple()[:6]
+        self.dhh = self.dmm = 0
+        self.tzname = 'UTC'
+
+
+def _deterministic_canvas(*args, fingerprint, generated_at, theme, **kwargs):
+    """
+    Canvas maker for reproducible output: the document ID is seeded from the
+    input fingerprint instead of the wall clock, and the info dates are the
+    recommendation's creation time.
+    """
+    pdf_canvas = NumberedCanvas(*args, theme=theme, **kwargs)
+    pdf_canvas._doc.signature = md5(fingerprint.encode())
+    pdf_canvas._doc._timeStamp = _FixedTimeStamp(generated_at)
+    return pdf_canvas
+
+
+def generate_recommendation_pdf(recommendation, student, theme=DEFAULT_THEME, output=None, deterministic=False):
+    """
+    Generate a premium, visually stunning PDF for career recommendation
+    
+    Args:
+        recommendation: CareerRecommendation instance
+        student: User instance (student)
+        theme: PdfTheme selecting the cached style catalog
+        output: Optional binary file object to write into (e.g. a
+            SpooledTemporaryFile or an open cache file)
+        deterministic: Produce identical bytes for identical inputs
+    
+    Returns:
+        The output file object (a new BytesIO buffer by default), rewound
+    """
+    return render_snapshot_pdf(build_render_snapshot(recommendation, student), theme, output, deterministic)
+
+
+def render_snapshot_bytes(snapshot, deterministic=False):
+    """Process-pool friendly entry point: plain data in, PDF bytes out."""
+    return render_snapshot_pdf(snapshot, deterministic=deterministic).getvalue()
+
+
+def render_snapshot_pdf(snapshot, theme=DEFAULT_THEME, output=None, deterministic=False):
+    """
+    Render a snapshot from build_render_snapshot()
+    
+    In deterministic mode the footer shows the recommendation's creation time
+    instead of the current time, ReportLab runs in invariant mode and the
+    document ID is derived from the snapshot fingerprint, so the same snapshot
+    always renders to the same bytes.
+    
+    Returns:
+        The output file object (a new BytesIO buffer by default), rewound
+    """
+    buffer = BytesIO() if output is None else output
+    if deterministic:
+        generated_at = snapshot['created_at']
+        canvasmaker = partial(
+            _deterministic_canvas,
+            fingerprint=snapshot_fingerprint(snapshot, theme),
+            generated_at=generated_at,
+            theme=theme,
+        )
+    else:
+        generated_at = datetime.now()
+        canvasmaker = partial(NumberedCanvas, theme=theme)
+    doc = SimpleDocTemplate(
+        buffer,
+        invariant=deterministic,
+        pagesize=letter,
+        rightMargin=0.5 * inch,
+        leftMargin=0.5 * inch,
+        topMargin=0.6 * inch,
+        bottomMargin=0.6 * inch,
+    )
+    
+    elements = []
+    styles = get_style_catalog(theme)
     
     # ========== PREMIUM HEADER DESIGN ==========
     
     # Decorative top border
     top_border = Table(
-        [[Paragraph('', ParagraphStyle('Empty', fontSize=1))]],
+        [[Paragraph('', styles.empty)]],
         colWidths=[7 * inch],
         rowHeights=[0.15 * inch]
     )
-    top_border.setStyle(
-        TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#4F46E5')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ])
-    )
+    top_border.setStyle(styles.top_border_table)
     elements.append(top_border)
     elements.append(Spacer(1, 0.4 * inch))
     
     # Hero Section with elegant typography
     hero_data = [
-        [Paragraph('CAREERPATH', hero_subtitle_style)],
-        [Paragraph('Career Recommendation Report', hero_title_style)],
+        [Paragraph('CAREERPATH', styles.hero_subtitle)],
+        [Paragraph('Career Recommendation Report', styles.hero_title)],
     ]
     hero_table = Table(hero_data, colWidths=[7 * inch])
-    hero_table.setStyle(
-        TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-        ])
-    )
+    hero_table.setStyle(styles.hero_table)
     elements.append(hero_table)
     elements.append(Spacer(1, 0.5 * inch))
     
     # ========== STUDENT INFORMATION CARD ==========
     
-    student_name = student.get_full_name() or student.email.split('@')[0].title()
+    student = snapshot['student']
     
     # Elegant info card with modern design
     student_card_data = [
         [
-            Paragraph('STUDENT INFORMATION', label_style),
+            Paragraph('STUDENT INFORMATION', styles.label),
             '',
         ],
         [
-            Paragraph('Full Name', label_style),
-            Paragraph(student_name, value_style),
+            Paragraph('Full Name', styles.label),
+            Paragraph(student['name'], styles.value),
         ],
         [
-            Paragraph('Email Address', label_style),
-            Paragraph(student.email, value_style),
+            Paragraph('Email Address', styles.label),
+            Paragraph(student['email'], styles.value),
         ],
     ]
     
-    if student.qualification:
+    if student['qualification']:
         student_card_data.append([
-            Paragraph('Qualification', label_style),
-            Paragraph(student.qualification, value_style),
+            Paragraph('Qualification', styles.label),
+            Paragraph(student['qualification'], styles.value),
         ])
     
     student_card_data.append([
-        Paragraph('Report Generated', label_style),
+        Paragraph('Report Generated', styles.label),
         Paragraph(
-            datetime.now().strftime("%B %d, %Y"),
-            value_style
+            generated_at.strftime("%B %d, %Y"),
+            styles.value
         ),
     ])
     
     student_card = Table(student_card_data, colWidths=[2.2 * inch, 4.8 * inch])
-    student_card.setStyle(
-        TableStyle([
-            # Header row
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E293B')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 14),
-            ('TOPPADDING', (0, 0), (-1, 0), 14),
-            ('LEFTPADDING', (0, 0), (-1, 0), 20),
-            ('RIGHTPADDING', (0, 0), (-1, 0), 20),
-            # Data rows
-            ('BACKGROUND', (0, 1), (0, -1), colors.HexColor('#F8FAFC')),
-            ('BACKGROUND', (1, 1), (1, -1), colors.white),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#0F172A')),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 1), (-1, -1), 20),
-            ('RIGHTPADDING', (0, 1), (-1, -1), 20),
-            ('TOPPADDING', (0, 1), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 12),
-            # Borders
-            ('BOX', (0, 0), (-1, -1), 1.5, colors.HexColor('#E2E8F0')),
-            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#4F46E5')),
-            ('LINEBELOW', (0, 1), (-1, -2), 0.5, colors.HexColor('#F1F5F9')),
-        ])
-    )
+    student_card.setStyle(styles.student_card_table)
     elements.append(student_card)
     elements.append(Spacer(1, 0.5 * inch))
     
@@ -322,7 +503,7 @@ def generate_recommendation_pdf(recommendation, student):
     divider = HRFlowable(
         width="100%",
         thickness=1,
-        color=colors.HexColor('#E2E8F0'),
+        color=colors.HexColor(styles.theme.border),
         spaceBefore=10,
         spaceAfter=30,
     )
@@ -330,24 +511,11 @@ def generate_recommendation_pdf(recommendation, student):
     
     # Career name in a premium card
     career_hero_data = [
-        [Paragraph('YOUR RECOMMENDED CAREER', hero_subtitle_style)],
-        [Paragraph(recommendation.career_name.upper(), career_name_style)],
+        [Paragraph('YOUR RECOMMENDED CAREER', styles.hero_subtitle)],
+        [Paragraph(snapshot['career_name'].upper(), styles.career_name)],
     ]
     career_hero_table = Table(career_hero_data, colWidths=[7 * inch])
-    career_hero_table.setStyle(
-        TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8FAFC')),
-            ('LEFTPADDING', (0, 0), (-1, -1), 30),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 30),
-            ('TOPPADDING', (0, 1), (-1, -1), 25),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 25),
-            ('BOX', (0, 0), (-1, -1), 0, colors.HexColor('#E2E8F0')),
-        ])
-    )
+    career_hero_table.setStyle(styles.career_hero_table)
     elements.append(career_hero_table)
     elements.append(Spacer(1, 0.4 * inch))
     
@@ -355,89 +523,53 @@ def generate_recommendation_pdf(recommendation, student):
     
     why_section_data = [
         [
-            Paragraph('WHY THIS CAREER?', subsection_style),
+            Paragraph('WHY THIS CAREER?', styles.subsection),
         ],
         [
-            Paragraph(recommendation.summary, body_style),
+            Paragraph(snapshot['summary'], styles.body),
         ],
     ]
-    why_section_table = Table(why_section_data, colWidths=[7 * inch])
-    why_section_table.setStyle(
-        TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFFFFF')),
-            ('LEFTPADDING', (0, 0), (-1, -1), 25),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 25),
-            ('TOPPADDING', (0, 0), (-1, -1), 20),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 25),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#E2E8F0')),
-            ('LINEBELOW', (0, 0), (-1, 0), 3, colors.HexColor('#4F46E5')),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#F8FAFC')),
-        ])
-    )
+    # Long summaries may flow onto the next page instead of overflowing the frame.
+    why_section_table = Table(why_section_data, colWidths=[7 * inch], splitInRow=1)
+    why_section_table.setStyle(styles.why_section_table)
     elements.append(why_section_table)
     elements.append(Spacer(1, 0.5 * inch))
     
     # ========== ROADMAP SECTION ==========
     
-    steps = recommendation.steps.all().order_by('order')
+    steps = snapshot['steps']
     if steps:
         # Section header
-        roadmap_header = Paragraph('YOUR CAREER ROADMAP', section_title_style)
+        roadmap_header = Paragraph('YOUR CAREER ROADMAP', styles.section_title)
         elements.append(roadmap_header)
         elements.append(Spacer(1, 0.3 * inch))
         
         for idx, step in enumerate(steps, 1):
             # Premium step card design
             step_number_cell = Table(
-                [[Paragraph(str(step.order), step_number_style)]],
+                [[Paragraph(str(step['order']), styles.step_number)]],
                 colWidths=[0.8 * inch],
                 rowHeights=[0.8 * inch]
             )
-            step_number_cell.setStyle(
-                TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#4F46E5')),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('BOX', (0, 0), (-1, -1), 0, colors.HexColor('#4F46E5')),
-                ])
-            )
+            step_number_cell.setStyle(styles.step_number_table)
             
             step_content_data = [
-                [Paragraph(step.title, step_title_style)],
+                [Paragraph(step['title'], styles.step_title)],
             ]
-            if step.description:
+            if step['description']:
                 step_content_data.append([
-                    Paragraph(step.description, step_desc_style)
+                    Paragraph(step['description'], styles.step_desc)
                 ])
             
             step_content = Table(step_content_data, colWidths=[6.2 * inch])
-            step_content.setStyle(
-                TableStyle([
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 20),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 20),
-                    ('TOPPADDING', (0, 0), (-1, -1), 15),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
-                ])
-            )
+            step_content.setStyle(styles.step_content_table)
             
             # Combine number and content
             step_row_data = [
                 [step_number_cell, step_content]
             ]
             step_row = Table(step_row_data, colWidths=[0.8 * inch, 6.2 * inch])
-            step_row.setStyle(
-                TableStyle([
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('BACKGROUND', (1, 0), (1, -1), colors.white),
-                    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#E2E8F0')),
-                    ('LINELEFT', (1, 0), (1, -1), 2, colors.HexColor('#4F46E5')),
-                ])
-            )
+            step_row.setStyle(styles.step_row_table)
             
             elements.append(step_row)
             
@@ -446,17 +578,11 @@ def generate_recommendation_pdf(recommendation, student):
                 elements.append(Spacer(1, 0.15 * inch))
                 # Vertical connector line
                 connector = Table(
-                    [[Paragraph('', ParagraphStyle('Empty', fontSize=1))]],
+                    [[Paragraph('', styles.empty)]],
                     colWidths=[0.4 * inch],
                     rowHeights=[0.3 * inch]
                 )
-                connector.setStyle(
-                    TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#4F46E5')),
-                        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ])
-                )
+                connector.setStyle(styles.connector_table)
                 elements.append(connector)
                 elements.append(Spacer(1, 0.15 * inch))
     
@@ -467,19 +593,20 @@ def generate_recommendation_pdf(recommendation, student):
     footer_divider = HRFlowable(
         width="100%",
         thickness=0.5,
-        color=colors.HexColor('#E2E8F0'),
+        color=colors.HexColor(styles.theme.border),
         spaceBefore=20,
         spaceAfter=15,
     )
     elements.append(footer_divider)
     
-    footer_text = f"Generated by CareerPath • {datetime.now().strftime('%B %d, %Y at %I:%M %p')} • Confidential Career Guidance Document"
-    footer = Paragraph(footer_text, footer_style)
+    footer_text = f"Generated by CareerPath • {generated_at.strftime('%B %d, %Y at %I:%M %p')} • Confidential Career Guidance Document"
+    footer = Paragraph(footer_text, styles.footer)
     elements.append(footer)
     elements.append(Spacer(1, 0.2 * inch))
     
     # ========== BUILD PDF ==========
     
-    doc.build(elements)
+    # Use custom canvas for page numbers
+    doc.build(elements, canvasmaker=canvasmaker)
     buffer.seek(0)
     return buffer
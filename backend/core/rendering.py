@@ -0,0 +1,273 @@
+"""
+Rendering backends for recommendation PDFs.
+
+ReportLab layout is pure-Python CPU work, so renders started from request or
+export-worker threads serialize on the GIL. The ``process`` backend ships plain
+render snapshots to a warm, bounded process pool instead; the ``inline``
+backend renders in the calling thread and is meant for tests and
+single-process setups.
+
+ReportLab is only imported once something is rendered, so web workers that
+never export a PDF do not pay for it at boot. Renders are deterministic, so a
+content fingerprint always names the same bytes (cache files, ETags, jobs).
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+
+from .report_snapshot import build_render_snapshot
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('process', 'inline')
+
+
+class RenderUnavailable(Exception):
+    """The render did not finish for reasons unrelated to its content; retry later."""
+
+
+class RenderTimeout(RenderUnavailable):
+    pass
+
+
+class RenderWorkerLost(RenderUnavailable):
+    """The worker process died mid-render (OOM kill, segfault)."""
+
+
+def _render(snapshot):
+    from .pdf_generator import render_snapshot_bytes
+
+    return render_snapshot_bytes(snapshot, deterministic=True)
+
+
+def _render_file(snapshot, path):
+    """Render straight to ``path`` so the PDF never crosses the process boundary."""
+    from .pdf_generator import render_snapshot_pdf
+
+    partial = f"{path}.{os.getpid()}-{threading.get_ident()}.part"
+    try:
+        with open(partial, 'wb') as handle:
+            render_snapshot_pdf(snapshot, output=handle, deterministic=True)
+        # Readers only ever see complete files.
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return path
+
+
+def _warm_worker():
+    # Pay for the ReportLab imports and the style catalog once per process.
+    from .pdf_generator import get_style_catalog
+
+    get_style_catalog()
+
+
+def _worker_main(connection):
+    """Loop of a render worker: ``(function, args)`` in, ``(ok, value)`` out."""
+    _warm_worker()
+    connection.send(None)  # Ready: renders are only timed from here on.
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        function, args = task
+        try:
+            reply = (True, function(*args))
+        except Exception as exc:
+            reply = (False, exc)
+        try:
+            connection.send(reply)
+        except Exception as exc:  # e.g. an exception that does not pickle
+            connection.send((False, RuntimeError(f"{type(exc).__name__}: {exc}")))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.tasks = 0
+        try:
+            self.connection.recv()
+        except EOFError:
+            self.process.join()
+            raise RenderWorkerLost("A PDF render worker failed to start.")
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+        self.connection.close()
+        self.process.join(timeout=5)
+
+
+class InlineRenderer:
+    backend = 'inline'
+    timeout = None
+
+    def call(self, function, *args):
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def submit(self, snapshot):
+        return self.call(_render, snapshot)
+
+    def render(self, snapshot):
+        return _render(snapshot)
+
+    def render_file(self, snapshot, path):
+        return _render_file(snapshot, path)
+
+    def shutdown(self):
+        pass
+
+
+class ProcessRenderer:
+    """
+    Render on a bounded set of warm worker processes, started lazily.
+
+    Workers are spawned rather than forked so they never inherit open database
+    connections, and each one is replaced after ``max_tasks_per_child`` renders
+    to cap memory growth. ``timeout`` runs from the moment a worker picks the
+    render up, not from when it was queued; a worker that overruns it is
+    killed and replaced on its own, so renders on the other workers carry on.
+    """
+    backend = 'process'
+
+    def __init__(self, workers, timeout=None, max_tasks_per_child=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self._context = multiprocessing.get_context('spawn')
+        # One slot per worker; None stands for a worker still to be started.
+        self._slots = queue.Queue()
+        for _ in range(workers):
+            self._slots.put(None)
+        self._workers = set()
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def _run(self, function, *args):
+        worker = self._slots.get()
+        try:
+            if worker is None:
+                worker = _Worker(self._context)
+                with self._lock:
+                    self._workers.add(worker)
+            try:
+                worker.connection.send((function, args))
+                finished = worker.connection.poll(self.timeout)
+                reply = worker.connection.recv() if finished else None
+            except (EOFError, OSError):
+                self._retire(worker, kill=True)
+                worker = None
+                raise RenderWorkerLost("The PDF render worker exited unexpectedly.")
+            if not finished:
+                self._retire(worker, kill=True)
+                worker = None
+                raise RenderTimeout(f"PDF render did not finish within {self.timeout} seconds.")
+            worker.tasks += 1
+            if self.max_tasks_per_child and worker.tasks >= self.max_tasks_per_child:
+                self._retire(worker)
+                worker = None
+        finally:
+            self._slots.put(worker)
+        ok, value = reply
+        if not ok:
+            raise value
+        return value
+
+    def _retire(self, worker, kill=False):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop(kill=kill)
+
+    def call(self, function, *args):
+        """Run ``function(*args)`` on a worker; return a Future."""
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pdf-render')
+            dispatcher = self._dispatcher
+        return dispatcher.submit(self._run, function, *args)
+
+    def submit(self, snapshot):
+        return self.call(_render, snapshot)
+
+    def render(self, snapshot):
+        return self._run(_render, snapshot)
+
+    def render_file(self, snapshot, path):
+        return self._run(_render_file, snapshot, os.fspath(path))
+
+    def shutdown(self):
+        with self._lock:
+            dispatcher, self._dispatcher = self._dispatcher, None
+            workers, self._workers = self._workers, set()
+        if dispatcher is not None:
+            dispatcher.shutdown(wait=True, cancel_futures=True)
+        for worker in workers:
+            worker.stop()
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """Return the process-wide renderer configured by the ``PDF_RENDER_*`` settings."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = _build_renderer()
+        return _renderer
+
+
+def _build_renderer():
+    backend = settings.PDF_RENDER_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF_RENDER_BACKEND '{backend}'. Use one of: {', '.join(BACKENDS)}.")
+    if backend == 'inline':
+        return InlineRenderer()
+    try:
+        # Fails early on platforms without working process semaphores.
+        multiprocessing.get_context('spawn').Lock()
+    except (ImportError, NotImplementedError, OSError):
+        logger.warning("Process pools are unavailable here; rendering PDFs inline.")
+        return InlineRenderer()
+    return ProcessRenderer(
+        workers=settings.PDF_RENDER_WORKERS,
+        timeout=settings.PDF_RENDER_TIMEOUT,
+        max_tasks_per_child=settings.PDF_RENDER_MAX_TASKS_PER_CHILD,
+    )
+
+
+def reset_renderer():
+    """Shut the current renderer down so the next call picks up new settings."""
+    global _renderer
+    with _renderer_lock:
+        renderer, _renderer = _renderer, None
+    if renderer is not None:
+        renderer.shutdown()
+
+
+def render_recommendation_pdf(recommendation, student):
+    """Render a recommendation with the configured backend and return the PDF bytes."""
+    return get_renderer().render(build_render_snapshot(recommendation, student))
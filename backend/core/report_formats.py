@@ -0,0 +1,163 @@
+"""
+Lightweight recommendation exports rendered from the same snapshot as the PDF.
+
+These are plain string templates, cheap enough to build in the web process.
+The PDF stays behind ``core.rendering``.
+"""
+import json
+from dataclasses import dataclass
+from html import escape
+
+from .report_snapshot import DEFAULT_THEME
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    name: str
+    media_type: str
+    extension: str
+
+
+PDF = ExportFormat('pdf', 'application/pdf', 'pdf')
+HTML = ExportFormat('html', 'text/html', 'html')
+MARKDOWN = ExportFormat('md', 'text/markdown', 'md')
+JSON = ExportFormat('json', 'application/json', 'json')
+
+EXPORT_FORMATS = {export_format.name: export_format for export_format in (PDF, HTML, MARKDOWN, JSON)}
+FORMAT_ALIASES = {'markdown': 'md'}
+# JSON is only available through ?format=json: application/json is what
+# HTTP clients such as axios send by default.
+NEGOTIABLE_FORMATS = {export_format.media_type: export_format for export_format in (PDF, HTML, MARKDOWN)}
+
+
+def accepted_export_format(accept):
+    """
+    The export format an Accept header names explicitly, or ``None``.
+
+    Wildcards are skipped. Any other type (``application/json``, browsers'
+    ``application/xhtml+xml``, ``text/plain``) means the header is a client
+    default rather than a request for an export, so it is ignored entirely.
+    """
+    ranked = []
+    for position, media_range in enumerate(accept.split(',')):
+        media_type, *params = [part.strip() for part in media_range.split(';')]
+        media_type = media_type.lower()
+        if not media_type or media_type.endswith('/*'):
+            continue
+        if media_type not in NEGOTIABLE_FORMATS:
+            return None
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranked.append((-quality, position, NEGOTIABLE_FORMATS[media_type]))
+    return min(ranked)[2] if ranked else None
+
+
+def _generated_on(snapshot):
+    return snapshot['created_at'].strftime('%B %d, %Y')
+
+
+def render_json(snapshot):
+    return json.dumps(
+        {**snapshot, 'created_at': snapshot['created_at'].isoformat()},
+        indent=2,
+        ensure_ascii=False,
+    )
+
+
+def _markdown_text(value):
+    # Keep user text from turning into headings, lists or emphasis.
+    return ''.join(f'\\{char}' if char in '\\`*_[]#<>|' else char for char in value)
+
+
+def render_markdown(snapshot):
+    student = snapshot['student']
+    lines = [
+        f"# {_markdown_text(snapshot['career_name'])}",
+        '',
+        f"- **Student:** {_markdown_text(student['name'])}",
+        f"- **Email address:** {_markdown_text(student['email'])}",
+    ]
+    if student['qualification']:
+        lines.append(f"- **Qualification:** {_markdown_text(student['qualification'])}")
+    lines += [
+        f"- **Report generated:** {_generated_on(snapshot)}",
+        '',
+        '## Why this career?',
+        '',
+        _markdown_text(snapshot['summary']),
+    ]
+    if snapshot['steps']:
+        lines += ['', '## Your career roadmap', '']
+        for step in snapshot['steps']:
+            lines.append(f"{step['order']}. **{_markdown_text(step['title'])}**")
+            if step['description']:
+                lines.append(f"   {_markdown_text(step['description'])}")
+    return '\n'.join(lines) + '\n'
+
+
+def render_html(snapshot, theme=DEFAULT_THEME):
+    """A single self-contained page: inline CSS, no scripts or external assets."""
+    student = snapshot['student']
+    steps = ''.join(
+        f"<li><strong>{escape(step['title'])}</strong>"
+        + (f"<p>{escape(step['description'])}</p>" if step['description'] else '')
+        + '</li>'
+        for step in snapshot['steps']
+    )
+    qualification = (
+        f"<div><dt>Qualification</dt><dd>{escape(student['qualification'])}</dd></div>"
+        if student['qualification'] else ''
+    )
+    roadmap = f"<h2>Your career roadmap</h2><ol>{steps}</ol>" if steps else ''
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{escape(snapshot['career_name'])} · CareerPath</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; color: {theme.body}; background: {theme.paper}; max-width: 46rem; margin: 2rem auto; padding: 0 1rem; line-height: 1.6; }}
+header {{ border-top: 6px solid {theme.brand}; padding-top: 1rem; }}
+h1 {{ color: {theme.ink}; margin-bottom: 0.25rem; }}
+h2 {{ color: {theme.heading}; border-bottom: 1px solid {theme.border}; padding-bottom: 0.25rem; }}
+dl {{ background: {theme.surface}; border: 1px solid {theme.border}; padding: 0.75rem 1rem; }}
+dl div {{ display: flex; gap: 1rem; }}
+dt {{ color: {theme.muted}; min-width: 9rem; }}
+dd {{ margin: 0; color: {theme.ink}; }}
+ol li {{ margin-bottom: 0.75rem; }}
+ol li p {{ margin: 0.25rem 0 0; }}
+footer {{ color: {theme.faint}; font-size: 0.8rem; border-top: 1px solid {theme.border}; margin-top: 2rem; padding-top: 0.5rem; }}
+</style>
+</head>
+<body>
+<header>
+<p>Your recommended career</p>
+<h1>{escape(snapshot['career_name'])}</h1>
+</header>
+<dl>
+<div><dt>Student</dt><dd>{escape(student['name'])}</dd></div>
+<div><dt>Email address</dt><dd>{escape(student['email'])}</dd></div>
+{qualification}
+<div><dt>Report generated</dt><dd>{_generated_on(snapshot)}</dd></div>
+</dl>
+<h2>Why this career?</h2>
+<p>{escape(snapshot['summary'])}</p>
+{roadmap}
+<footer>Generated by CareerPath · Confidential Career Guidance Document</footer>
+</body>
+</html>
+"""
+
+
+TEXT_RENDERERS = {
+    HTML.name: render_html,
+    MARKDOWN.name: render_markdown,
+    JSON.name: render_json,
+}
@@ -0,0 +1,60 @@
+"""
+Plain data behind the recommendation PDF: the theme and render snapshots.
+
+Kept free of ReportLab so fingerprints and job bookkeeping can be computed
+without loading the PDF stack; ``pdf_generator`` is imported only to render.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PdfTheme:
+    """
+    Palette used by the report. Bump ``version`` whenever the look changes so
+    cached style catalogs (and anything keyed on the theme) are rebuilt.
+    """
+    version: int = 1
+    brand: str = '#4F46E5'         # Brand indigo
+    ink: str = '#0F172A'           # Deep slate
+    heading: str = '#1E293B'
+    subheading: str = '#334155'
+    body: str = '#475569'
+    muted: str = '#64748B'
+    faint: str = '#94A3B8'
+    border: str = '#E2E8F0'
+    rule: str = '#F1F5F9'
+    surface: str = '#F8FAFC'
+    paper: str = '#FFFFFF'
+
+
+DEFAULT_THEME = PdfTheme()
+
+
+def build_render_snapshot(recommendation, student):
+    """
+    Copy everything the report shows into plain, picklable data so rendering
+    can run away from the ORM (worker processes, caches, fingerprints).
+    """
+    return {
+        'career_name': recommendation.career_name,
+        'summary': recommendation.summary,
+        'created_at': recommendation.created_at,
+        'steps': [
+            {'order': step.order, 'title': step.title, 'description': step.description}
+            # Sort in Python so prefetched steps are not queried again.
+            for step in sorted(recommendation.steps.all(), key=lambda step: step.order)
+        ],
+        'student': {
+            'name': student.get_full_name() or student.email.split('@')[0].title(),
+            'email': student.email,
+            'qualification': student.qualification,
+        },
+    }
+
+
+def snapshot_fingerprint(snapshot, theme=DEFAULT_THEME):
+    """Hash everything the PDF shows, so unchanged content maps to the same key."""
+    content = json.dumps({'theme': theme.version, 'snapshot': snapshot}, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
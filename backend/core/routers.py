@@ -0,0 +1,130 @@
+"""
+Send safe reads to a read replica, keeping read-your-writes.
+
+ReplicaRoutingMiddleware records the current request in a context variable.
+Reads go to a replica (any alias in ``READ_REPLICAS``) only while handling a
+GET/HEAD/OPTIONS request from a user who has not written anything in the last
+``REPLICA_PIN_SECONDS``. Everything else, such as unsafe requests, reads
+inside a transaction, management commands and export workers, uses the
+primary. With no replica configured, every query goes to ``default``.
+
+Pins are stored in the Django cache, which must be shared by every worker
+process: settings switch to the database cache when a replica is configured,
+and check_replica_cache() reports per-process backends. The cache table
+itself is always read on the primary.
+"""
+import random
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject, empty
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@dataclass
+class _RoutingState:
+    request: object
+    primary: bool
+    pinned: Optional[bool] = None
+
+
+_state = ContextVar('core_db_routing', default=None)
+
+
+def _pin_key(user_id):
+    return f'db-primary-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    cache.set(_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def _resolved_user(request):
+    """
+    The request's user if authentication already ran, else ``None``.
+
+    Django's lazy user is left alone: evaluating it queries the database
+    from inside the router. DRF replaces it once it authenticates the request.
+    """
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user
+
+
+def _reads_from_primary():
+    state = _state.get()
+    if state is None or state.primary:
+        return True
+    if state.pinned is None:
+        user = _resolved_user(state.request)
+        if user is None:
+            return False
+        state.pinned = bool(user.is_authenticated and cache.get(_pin_key(user.pk)))
+    return state.pinned
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        unsafe = request.method not in SAFE_METHODS
+        token = _state.set(_RoutingState(request, primary=unsafe))
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if unsafe and settings.READ_REPLICAS:
+            user = _resolved_user(request)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.pk)
+        return response
+
+
+def check_replica_cache(app_configs, **kwargs):
+    if settings.READ_REPLICAS and settings.CACHES['default']['BACKEND'] in PER_PROCESS_CACHES:
+        return [checks.Error(
+            'A read replica needs a cache shared by all worker processes for read-your-writes pins.',
+            hint='Use the database, Redis or Memcached cache backend for CACHES["default"].',
+            id='core.E001',
+        )]
+    return []
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.READ_REPLICAS
+        if (
+            not replicas
+            # DatabaseCache entries, pins included, are only current on the primary.
+            or model._meta.app_label == 'django_cache'
+            or _reads_from_primary()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == DEFAULT_DB_ALIAS:
+            # Follow relations from a primary row on the primary too.
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,198 @@
+"""
+Full-text search over resources, companies, jobs and question templates.
+
+Each searchable row is mirrored into a SearchDocument (by core.signals and
+the catalog importer). The database indexes the documents itself:
+
+* SQLite: an external-content FTS5 table fed by triggers, ranked with bm25.
+* PostgreSQL: a generated ``tsvector`` column with a GIN index, ranked with
+  ``ts_rank_cd``.
+
+Titles weigh more than bodies, and every query word also matches as a prefix.
+Other backends fall back to ``LIKE`` without ranking.
+"""
+import re
+from itertools import islice
+
+from django.db import connection, models, transaction
+from django.db.models.expressions import RawSQL
+
+from .models import CareerResource, Company, JobRecommendation, QuestionTemplate, SearchDocument
+
+FTS_TABLE = 'core_searchdocument_fts'
+MAX_TERMS = 10
+INDEX_CHUNK_SIZE = 500
+DOCUMENT_FIELDS = (
+    'title', 'body', 'category_id', 'resource_type', 'difficulty_level', 'recommendation_id', 'is_active',
+)
+
+
+def _text(*parts):
+    return '\n'.join(part for part in parts if part)
+
+
+def _resource_document(resource):
+    return {
+        'title': resource.title,
+        'body': resource.description,
+        'category_id': resource.category_id,
+        'resource_type': resource.resource_type,
+        'difficulty_level': resource.difficulty_level,
+        'recommendation_id': resource.career_recommendation_id,
+        'is_active': resource.is_active,
+    }
+
+
+def _company_document(company):
+    return {
+        'title': company.name,
+        'body': _text(company.description, company.industry, company.location, company.email),
+        'category_id': company.category_id,
+        'is_active': company.is_active,
+    }
+
+
+def _job_document(job):
+    return {
+        'title': job.job_title,
+        'body': _text(job.company.name, job.job_description, job.requirements),
+        'category_id': job.company.category_id,
+        'recommendation_id': job.career_recommendation_id,
+        'is_active': job.is_active,
+    }
+
+
+def _question_template_document(template):
+    return {
+        'title': template.prompt,
+        'category_id': template.category_id,
+        'is_active': template.is_active,
+    }
+
+
+INDEXED_MODELS = {
+    CareerResource: (SearchDocument.Kind.RESOURCE, _resource_document, ()),
+    Company: (SearchDocument.Kind.COMPANY, _company_document, ()),
+    JobRecommendation: (SearchDocument.Kind.JOB, _job_document, ('company',)),
+    QuestionTemplate: (SearchDocument.Kind.QUESTION_TEMPLATE, _question_template_document, ()),
+}
+
+
+def index_instances(instances):
+    """Upsert the search documents for saved instances of any indexed model."""
+    by_model = {}
+    for instance in instances:
+        if type(instance) in INDEXED_MODELS:
+            by_model.setdefault(type(instance), []).append(instance)
+    for model, batch in by_model.items():
+        kind, build, related = INDEXED_MODELS[model]
+        if related:
+            models.prefetch_related_objects(batch, *related)
+        SearchDocument.objects.bulk_create(
+            [
+                SearchDocument(kind=kind, object_id=instance.pk, **{
+                    'resource_type': '', 'difficulty_level': '', 'recommendation_id': None, **build(instance),
+                })
+                for instance in batch
+            ],
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=DOCUMENT_FIELDS,
+        )
+
+
+def remove_instance(instance):
+    kind = INDEXED_MODELS[type(instance)][0]
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def rebuild():
+    """Re-create every document from scratch, e.g. after bulk ``update()`` calls."""
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        for model, (_, _, related) in INDEXED_MODELS.items():
+            rows = model.objects.select_related(*related).order_by('pk').iterator(chunk_size=INDEX_CHUNK_SIZE)
+            while batch := list(islice(rows, INDEX_CHUNK_SIZE)):
+                index_instances(batch)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return SearchDocument.objects.count()
+
+
+def query_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def _search_sql(terms, kinds=None, category_id=None, resource_type=None, difficulty_level=None,
+                active_only=True, recommendation_ids=None):
+    """Unordered ``(sql, params)`` selecting every document column plus ``score``."""
+    where, params = [], []
+    if kinds:
+        where.append(f"d.kind IN ({', '.join(['%s'] * len(kinds))})")
+        params += list(kinds)
+    for column, value in (
+        ('category_id', category_id), ('resource_type', resource_type), ('difficulty_level', difficulty_level),
+    ):
+        if value is not None:
+            where.append(f'd.{column} = %s')
+            params.append(value)
+    if active_only:
+        where.append('d.is_active = %s')
+        params.append(True)
+    if recommendation_ids is not None:
+        scoped = ' OR '.join(['d.recommendation_id IS NULL'] + ['d.recommendation_id = %s'] * len(recommendation_ids))
+        where.append(f'({scoped})')
+        params += list(recommendation_ids)
+
+    columns = ', '.join(f'd.{connection.ops.quote_name(field.column)}' for field in SearchDocument._meta.concrete_fields)
+    filters = ''.join(f' AND {clause}' for clause in where)
+    if connection.vendor == 'sqlite':
+        sql = (
+            f"SELECT {columns}, -bm25({FTS_TABLE}, 10.0, 1.0) AS score "
+            f"FROM {FTS_TABLE} JOIN core_searchdocument d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s{filters}"
+        )
+        params = [' AND '.join(f'"{term}"*' for term in terms)] + params
+    elif connection.vendor == 'postgresql':
+        sql = (
+            f"SELECT {columns}, ts_rank_cd(d.search_vector, query) AS score "
+            f"FROM core_searchdocument d CROSS JOIN to_tsquery('english', %s) query "
+            f"WHERE d.search_vector @@ query{filters}"
+        )
+        params = [' & '.join(f'{term}:*' for term in terms)] + params
+    else:
+        sql = f"SELECT {columns}, 0 AS score FROM core_searchdocument d WHERE 1 = 1{filters}"
+        for term in terms:
+            sql += " AND (UPPER(d.title) LIKE UPPER(%s) OR UPPER(d.body) LIKE UPPER(%s))"
+            params += [f'%{term}%', f'%{term}%']
+    return sql, params
+
+
+def search(query, kinds=None, category_id=None, resource_type=None, difficulty_level=None,
+           active_only=True, recommendation_ids=None, limit=20, offset=0):
+    """
+    Return SearchDocuments matching every word of ``query`` (as a prefix),
+    best first, each with a ``score`` attribute. ``recommendation_ids``
+    limits results to general rows plus rows linked to those recommendations.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    sql, params = _search_sql(
+        terms, kinds, category_id, resource_type, difficulty_level, active_only, recommendation_ids,
+    )
+    sql += ' ORDER BY score DESC, d.id LIMIT %s OFFSET %s'
+    return list(SearchDocument.objects.raw(sql, params + [limit, offset]))
+
+
+def matching_ids(kind, query):
+    """
+    Primary keys of every ``kind`` row matching ``query``, inactive ones
+    included, as a subquery for ``pk__in`` (no limit, nothing fetched).
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    sql, params = _search_sql(terms, kinds=[kind], active_only=False)
+    return RawSQL(f'SELECT matches.object_id FROM ({sql}) matches', params)
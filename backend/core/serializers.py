@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.urls import reverse
 import re
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from .archival import test_snapshot
 from .models import (
     CareerRecommendation,
     CareerResource,
@@ -15,6 +18,7 @@ from .models import (
     QuestionCategory,
     QuestionTemplate,
     Question,
+    RecommendationExportJob,
     ResourceCategory,
     RoadmapStep,
     StudentAnswer,
@@ -137,29 +141,71 @@ class QuestionSerializer(serializers.ModelSerializer):
         fields = ('id', 'prompt', 'order', 'options')
 
 
+class QuestionBulkCreateSerializer(serializers.ListSerializer):
+    """
+    Creates a batch of questions for one test with two INSERTs in a single
+    transaction. Items keep the ``order`` they are sent with; items without
+    one are numbered, in batch order, after the test's last question and
+    after every order given in the batch.
+    """
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            personalized_test = PersonalizedTest.objects.select_for_update().get(
+                id=validated_data[0]['personalized_test'].id
+            )
+            last_order = max(
+                [personalized_test.questions.aggregate(max_order=models.Max('order'))['max_order'] or 0]
+                + [question_data['order'] for question_data in validated_data if 'order' in question_data]
+            )
+            questions = []
+            for question_data in validated_data:
+                if 'order' in question_data:
+                    order = question_data['order']
+                else:
+                    last_order += 1
+                    order = last_order
+                options = [Option(**option_data) for option_data in question_data['options']]
+                question = Question(
+                    personalized_test=personalized_test,
+                    prompt=question_data['prompt'],
+                    order=order,
+                )
+                questions.append((question, options))
+            return Question.objects.bulk_create_with_options(questions)
+
+
 class QuestionCreateSerializer(serializers.ModelSerializer):
     options = OptionCreateSerializer(many=True)
 
     class Meta:
         model = Question
         fields = ('prompt', 'order', 'options')
+        list_serializer_class = QuestionBulkCreateSerializer
 
     def create(self, validated_data):
         options_data = validated_data.pop('options')
-        question = Question.objects.create(**validated_data)
-        for option_data in options_data:
-            Option.objects.create(question=question, **option_data)
+        options = [Option(**option_data) for option_data in options_data]
+        [question] = Question.objects.bulk_create_with_options([(Question(**validated_data), options)])
         return question
 
 
 class PersonalizedTestSerializer(serializers.ModelSerializer):
     request = TestRequestSerializer()
-    questions = QuestionSerializer(many=True)
+    questions = serializers.SerializerMethodField()
 
     class Meta:
         model = PersonalizedTest
         fields = ('id', 'request', 'status', 'assigned_at', 'completed_at', 'questions')
 
+    def get_questions(self, obj):
+        if obj.archived_at:
+            return [
+                {key: question[key] for key in ('id', 'prompt', 'order', 'options')}
+                for question in test_snapshot(obj)['questions']
+            ]
+        return QuestionSerializer(obj.questions.all(), many=True).data
+
 
 class StudentAnswerSerializer(serializers.ModelSerializer):
     question = serializers.PrimaryKeyRelatedField(queryset=Question.objects.all())
@@ -178,6 +224,7 @@ class StudentAnswerSerializer(serializers.ModelSerializer):
         student = self.context['request'].user
         answer, _ = StudentAnswer.objects.update_or_create(
             question=validated_data['question'],
+            personalized_test_id=validated_data['question'].personalized_test_id,
             student=student,
             defaults={'option': validated_data['option']},
         )
@@ -207,10 +254,8 @@ class CareerRecommendationSerializer(serializers.ModelSerializer):
         fields = ('id', 'career_name', 'summary', 'companies', 'created_at', 'steps', 'resources', 'job_recommendations')
     
     def get_companies(self, obj):
-        # Split the companies text by newlines and remove any empty lines
-        if obj.companies:
-            return [company.strip() for company in obj.companies.split('\n') if company.strip()]
-        return []
+        # Prefetch 'company_links__company' when serializing many recommendations.
+        return [link.company.name for link in obj.company_links.all()]
 
     def get_resources(self, obj):
         resources = obj.resources.filter(is_active=True).order_by('order', 'created_at')
@@ -221,24 +266,59 @@ class CareerRecommendationSerializer(serializers.ModelSerializer):
         return JobRecommendationSerializer(jobs, many=True, context=self.context).data
 
 
+class CompanyNamesField(serializers.Field):
+    """Company names as a list, or as text with one name per line."""
+
+    default_error_messages = {
+        'invalid': 'Expected a list of company names or one name per line.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = data.split('\n')
+        if not isinstance(data, list) or not all(isinstance(name, str) for name in data):
+            self.fail('invalid')
+        return [name.strip() for name in data if name.strip()]
+
+    def to_representation(self, value):
+        return value
+
+
 class CareerRecommendationCreateSerializer(serializers.ModelSerializer):
     steps = RoadmapStepCreateSerializer(many=True)
+    companies = CompanyNamesField(required=False, write_only=True)
 
     class Meta:
         model = CareerRecommendation
         fields = ('career_name', 'summary', 'companies', 'steps')
-        extra_kwargs = {
-            'companies': {'required': False, 'allow_blank': True}
-        }
 
     def create(self, validated_data):
         steps_data = validated_data.pop('steps')
-        recommendation = CareerRecommendation.objects.create(**validated_data)
-        for step_data in steps_data:
-            RoadmapStep.objects.create(recommendation=recommendation, **step_data)
+        company_names = validated_data.pop('companies', [])
+        with transaction.atomic():
+            recommendation = CareerRecommendation.objects.create(**validated_data)
+            RoadmapStep.objects.bulk_create(
+                RoadmapStep(recommendation=recommendation, **step_data) for step_data in steps_data
+            )
+            recommendation.set_companies(company_names)
         return recommendation
 
 
+class RecommendationExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecommendationExportJob
+        fields = ('id', 'recommendation', 'status', 'error', 'created_at', 'started_at', 'finished_at', 'download_url')
+
+    def get_download_url(self, obj):
+        if obj.status != RecommendationExportJob.Status.SUCCEEDED:
+            return None
+        url = reverse('student-export-job-download', kwargs={'job_id': obj.id})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
 class CompanyCategorySerializer(serializers.ModelSerializer):
     companies_count = serializers.SerializerMethodField()
     
@@ -453,9 +533,12 @@ class OptionTemplateSerializer(serializers.ModelSerializer):
 
 
 class OptionTemplateCreateSerializer(serializers.ModelSerializer):
+    # Optional on update: identifies the existing option to edit in place.
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = OptionTemplate
-        fields = ('label', 'description', 'order')
+        fields = ('id', 'label', 'description', 'order')
 
 
 class QuestionTemplateSerializer(serializers.ModelSerializer):
@@ -482,24 +565,81 @@ class QuestionTemplateCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         options_data = validated_data.pop('options')
-        template = QuestionTemplate.objects.create(**validated_data)
-        for option_data in options_data:
-            OptionTemplate.objects.create(question=template, **option_data)
+        with transaction.atomic():
+            template = QuestionTemplate.objects.create(**validated_data)
+            OptionTemplate.objects.bulk_create(
+                OptionTemplate(question=template, **self._option_fields(option_data))
+                for option_data in options_data
+            )
         return template
 
     def update(self, instance, validated_data):
-        # Simple update: replace options if provided
         options_data = validated_data.pop('options', None)
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        if options_data is not None:
-            instance.options.all().delete()
-            for option_data in options_data:
-                OptionTemplate.objects.create(question=instance, **option_data)
+        with transaction.atomic():
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+            if options_data is not None:
+                self._sync_options(instance, options_data)
         return instance
 
+    @staticmethod
+    def _option_fields(option_data):
+        return {key: value for key, value in option_data.items() if key != 'id'}
+
+    def validate_options(self, value):
+        option_ids = [option['id'] for option in value if option.get('id') is not None]
+        if len(option_ids) != len(set(option_ids)):
+            raise serializers.ValidationError("Duplicate option ids.")
+        if option_ids and self.instance is not None:
+            known_ids = set(self.instance.options.values_list('id', flat=True))
+            unknown_ids = sorted(set(option_ids) - known_ids)
+            if unknown_ids:
+                raise serializers.ValidationError(f"Options {unknown_ids} do not belong to this question.")
+        return value
+
+    def _sync_options(self, template, options_data):
+        """
+        Diff the submitted options against the stored ones: rows are matched by
+        ``id`` when given, otherwise by ``order``; only changed rows are updated,
+        new ones inserted and unmatched ones deleted.
+        """
+        existing = list(OptionTemplate.objects.filter(question=template))
+        by_id = {option.id: option for option in existing}
+        referenced_ids = {option_data['id'] for option_data in options_data if option_data.get('id') is not None}
+        by_order = {}
+        for option in existing:
+            if option.id not in referenced_ids:
+                by_order.setdefault(option.order, option)
+
+        claimed = set()
+        to_create, to_update = [], []
+        changed_fields = set()
+        for option_data in options_data:
+            fields = self._option_fields(option_data)
+            if option_data.get('id') is not None:
+                option = by_id[option_data['id']]
+            else:
+                option = by_order.get(fields.get('order', 0))
+            if option is None or option.id in claimed:
+                to_create.append(OptionTemplate(question=template, **fields))
+                continue
+            claimed.add(option.id)
+            dirty = [name for name, value in fields.items() if getattr(option, name) != value]
+            if dirty:
+                for name in dirty:
+                    setattr(option, name, fields[name])
+                changed_fields.update(dirty)
+                to_update.append(option)
+
+        removed_ids = [option.id for option in existing if option.id not in claimed]
+        if removed_ids:
+            OptionTemplate.objects.filter(id__in=removed_ids).delete()
+        if to_update:
+            OptionTemplate.objects.bulk_update(to_update, sorted(changed_fields))
+        if to_create:
+            OptionTemplate.objects.bulk_create(to_create)
+
 
 class StudentResourceProgressSerializer(serializers.ModelSerializer):
     resource = CareerResourceSerializer(read_only=True)
@@ -0,0 +1,63 @@
+"""
+Keep denormalized data in step with single-row writes: PersonalizedTest
+progress counters and the full-text SearchDocuments.
+
+Bulk paths (QuestionManager.bulk_create_with_options, the catalog importer)
+update them themselves because bulk_create sends no signals.
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .models import Company, PersonalizedTest, Question, StudentAnswer
+
+
+def _bump(test_id, field, delta):
+    tests = PersonalizedTest.objects.filter(id=test_id)
+    if delta < 0:
+        # Never push a drifted counter below zero; the repair command fixes it.
+        tests = tests.filter(**{f'{field}__gte': -delta})
+    tests.update(**{field: F(field) + delta})
+
+
+@receiver(post_save, sender=Question, dispatch_uid='core.question_added')
+def question_added(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _bump(instance.personalized_test_id, 'questions_count', 1)
+
+
+@receiver(post_delete, sender=Question, dispatch_uid='core.question_removed')
+def question_removed(sender, instance, **kwargs):
+    _bump(instance.personalized_test_id, 'questions_count', -1)
+
+
+@receiver(post_save, sender=StudentAnswer, dispatch_uid='core.answer_added')
+def answer_added(sender, instance, created, raw=False, **kwargs):
+    # Changing an existing answer keeps the count; only first answers add one.
+    if created and not raw:
+        _bump(instance.personalized_test_id, 'answered_count', 1)
+
+
+@receiver(post_delete, sender=StudentAnswer, dispatch_uid='core.answer_removed')
+def answer_removed(sender, instance, **kwargs):
+    _bump(instance.personalized_test_id, 'answered_count', -1)
+
+
+def search_document_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_instances([instance])
+    if sender is Company:
+        # Job documents include the company's name and category.
+        search.index_instances(list(instance.job_recommendations.all()))
+
+
+def search_document_deleted(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+for indexed_model in search.INDEXED_MODELS:
+    label = indexed_model._meta.model_name
+    post_save.connect(search_document_saved, sender=indexed_model, dispatch_uid=f'core.index_{label}')
+    post_delete.connect(search_document_deleted, sender=indexed_model, dispatch_uid=f'core.unindex_{label}')
@@ -0,0 +1,34 @@
+"""
+Connection setup for SQLite deployments.
+
+SQLite's defaults suit a single-user desktop: a rollback journal that makes
+readers and writers block each other and an fsync on every commit. Each new
+connection gets the ``SQLITE_PRAGMAS`` profile from settings instead; the
+benchmark_sqlite command measures the difference.
+"""
+import re
+
+from django.conf import settings
+
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+
+def pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if not name.isidentifier() or not PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"Invalid SQLite pragma: {name}={value!r}")
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """``connection_created`` receiver; a no-op for other database vendors."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(pragmas):
+            cursor.execute(statement)
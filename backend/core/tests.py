@@ -1,3 +1,989 @@
-from django.test import TestCase
+import importlib
+import importlib.util
+import io
+import os
+import runpy
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from reportlab.lib.colors import HexColor
+from reportlab.pdfgen.canvas import Canvas
+from rest_framework.test import APIClient
+
+from . import search
+from .archival import archive_tests
+from .downloads import file_download
+from .exports import (
+    MAX_ATTEMPTS,
+    claim_next_job,
+    min_stale_after,
+    render_job,
+    request_export,
+    requeue_stale_jobs,
+    run_worker,
+)
+from .importers import MAX_REPORTED_ERRORS, ImportFormatError, import_catalog
+from .models import (
+    CareerRecommendation,
+    CareerResource,
+    Company,
+    CompanyCategory,
+    Option,
+    OptionTemplate,
+    PersonalizedTest,
+    Question,
+    QuestionCategory,
+    QuestionTemplate,
+    RecommendationExportJob,
+    RoadmapStep,
+    SearchDocument,
+    StudentAnswer,
+    TestRequest,
+    User,
+)
+from .pdf_generator import NumberedCanvas, generate_recommendation_pdf
+from .rendering import ProcessRenderer, RenderTimeout, RenderUnavailable, reset_renderer
+from .report_snapshot import DEFAULT_THEME, PdfTheme
+from .routers import PrimaryReplicaRouter, ReplicaRoutingMiddleware, check_replica_cache
+from .serializers import QuestionTemplateCreateSerializer
+from .transitions import TransitionConflict, TransitionError, assign_test, create_test, submit_test
+
+
+class DeterministicPdfTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(
+            'student@example.com', 'password', first_name='Asha', last_name='Rao', qualification='B.Sc',
+        )
+        test_request = TestRequest.objects.create(student=cls.student)
+        personalized_test = PersonalizedTest.objects.create(request=test_request, status=PersonalizedTest.Status.COMPLETED)
+        cls.recommendation = CareerRecommendation.objects.create(
+            personalized_test=personalized_test,
+            career_name='Data Scientist',
+            summary='Strong analytical answers throughout the test.',
+        )
+        for order in range(1, 4):
+            RoadmapStep.objects.create(recommendation=cls.recommendation, order=order, title=f'Step {order}')
+
+    def render(self, deterministic=True):
+        recommendation = CareerRecommendation.objects.prefetch_related('steps').get(id=self.recommendation.id)
+        return generate_recommendation_pdf(recommendation, self.student, deterministic=deterministic).getvalue()
+
+    def render_later(self, deterministic=True):
+        # An hour later, as far as ReportLab and the footer are concerned.
+        later = time.time() + 3600
+        with mock.patch('time.time', return_value=later):
+            return self.render(deterministic)
+
+    def test_identical_inputs_render_identical_bytes(self):
+        self.assertEqual(self.render(), self.render_later())
+
+    def test_default_mode_depends_on_the_clock(self):
+        self.assertNotEqual(self.render(deterministic=False), self.render_later(deterministic=False))
+
+    def test_content_changes_change_the_bytes(self):
+        before = self.render()
+        RoadmapStep.objects.create(recommendation=self.recommendation, order=4, title='Step 4')
+        self.assertNotEqual(before, self.render())
+
+    def test_page_numbers_follow_the_theme(self):
+        theme = PdfTheme(version=2, faint='#123456')
+        recommendation = CareerRecommendation.objects.prefetch_related('steps').get(id=self.recommendation.id)
+        with mock.patch.object(NumberedCanvas, 'setFillColor', autospec=True, side_effect=Canvas.setFillColor) as fill:
+            generate_recommendation_pdf(recommendation, self.student, theme=theme)
+        fill_colors = {call.args[1].hexval() for call in fill.call_args_list if hasattr(call.args[1], 'hexval')}
+        self.assertIn('0x123456', fill_colors)
+        self.assertNotIn(HexColor(DEFAULT_THEME.faint).hexval(), fill_colors)
+
+    def test_generation_date_is_the_recommendation_date(self):
+        created_at = self.recommendation.created_at.strftime('%Y%m%d%H%M%S')
+        self.assertIn(f'/CreationDate (D:{created_at}'.encode(), self.render())
+
+
+class ExportFormatTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student@example.com', 'password')
+        test_request = TestRequest.objects.create(student=cls.student)
+        personalized_test = PersonalizedTest.objects.create(request=test_request, status=PersonalizedTest.Status.COMPLETED)
+        cls.recommendation = CareerRecommendation.objects.create(
+            personalized_test=personalized_test, career_name='Data Scientist', summary='Analytical.',
+        )
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        settings_override = override_settings(PDF_CACHE_DIR=cache_dir.name, PDF_RENDER_BACKEND='inline')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_renderer()
+        self.addCleanup(reset_renderer)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def export_type(self, query='', **headers):
+        response = self.client.get(f'/api/student/recommendations/{self.recommendation.id}/export/{query}', **headers)
+        self.assertEqual(response.status_code, 200)
+        return response['Content-Type'].split(';')[0]
+
+    def test_no_format_is_a_pdf(self):
+        self.assertEqual(self.export_type(), 'application/pdf')
+
+    def test_client_default_accept_headers_get_a_pdf(self):
+        for accept in (
+            'application/json, text/plain, */*',
+            'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            '*/*',
+        ):
+            with self.subTest(accept=accept):
+                self.assertEqual(self.export_type(HTTP_ACCEPT=accept), 'application/pdf')
+
+    def test_explicit_accept_picks_the_format(self):
+        self.assertEqual(self.export_type(HTTP_ACCEPT='text/markdown'), 'text/markdown')
+        self.assertEqual(self.export_type(HTTP_ACCEPT='application/pdf;q=0.5, text/html'), 'text/html')
+
+    def test_interrupted_render_is_a_503(self):
+        with mock.patch('core.exports.get_renderer') as get_renderer:
+            get_renderer.return_value.render_file.side_effect = RenderUnavailable('worker lost')
+            response = self.client.get(f'/api/student/recommendations/{self.recommendation.id}/export/')
+        self.assertEqual(response.status_code, 503)
+
+    def test_format_parameter_wins(self):
+        self.assertEqual(self.export_type('?format=json', HTTP_ACCEPT='application/pdf'), 'application/json')
+        self.assertEqual(self.export_type('?format=pdf'), 'application/pdf')
+
+
+class ProcessRendererTests(SimpleTestCase):
+    def renderer(self, workers, timeout):
+        renderer = ProcessRenderer(workers=workers, timeout=timeout)
+        self.addCleanup(renderer.shutdown)
+        return renderer
+
+    def test_timeout_only_kills_the_hung_worker(self):
+        renderer = self.renderer(workers=2, timeout=2)
+        hung = renderer.call(time.sleep, 60)
+        healthy = renderer.call(time.sleep, 1)
+        self.assertIsNone(healthy.result(timeout=30))
+        self.assertRaises(RenderTimeout, hung.result, timeout=30)
+        # The replacement worker serves the next render.
+        self.assertIsInstance(renderer.call(os.getpid).result(timeout=30), int)
+
+    def test_time_spent_queued_is_not_counted(self):
+        renderer = self.renderer(workers=1, timeout=2)
+        renderer.call(os.getpid).result(timeout=30)  # Start the worker.
+        first, second = renderer.call(time.sleep, 1.5), renderer.call(time.sleep, 1.5)
+        self.assertIsNone(first.result(timeout=30))
+        self.assertIsNone(second.result(timeout=30))
+
+    def test_lost_worker_is_retryable(self):
+        renderer = self.renderer(workers=1, timeout=10)
+        with self.assertRaises(RenderUnavailable):
+            renderer.call(os._exit, 1).result(timeout=30)
+        self.assertIsInstance(renderer.call(os.getpid).result(timeout=30), int)
+
+    def test_render_errors_are_raised_in_the_caller(self):
+        renderer = self.renderer(workers=1, timeout=10)
+        with self.assertRaises(ValueError):
+            renderer.call(int, 'not a number').result(timeout=30)
+
+
+class HotPathIndexTests(TestCase):
+    """
+    EXPLAIN the queries the views run and check the planner picks the index
+    meant for them. Runs against whichever backend is configured (SQLite or
+    PostgreSQL); PostgreSQL is told to avoid sequential scans, which it would
+    otherwise prefer on near-empty test tables.
+    """
+
+    def assertUsesIndex(self, queryset, index_name, sqlite_index=None):
+        """
+        ``sqlite_index`` is what to look for on SQLite when the index name does
+        not survive there (unique constraints become ``sqlite_autoindex_*``).
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        elif connection.vendor == 'sqlite':
+            index_name = sqlite_index or index_name
+        else:
+            self.skipTest(f"No EXPLAIN expectations for {connection.vendor}.")
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"Expected {index_name} in plan:\n{plan}")
+
+    def test_admin_request_queue(self):
+        self.assertUsesIndex(
+            TestRequest.objects.filter(status=TestRequest.Status.PENDING).order_by('-created_at'),
+            'request_status_created_idx',
+        )
+
+    def test_dashboard_pending_this_week(self):
+        self.assertUsesIndex(
+            TestRequest.objects.filter(
+                status=TestRequest.Status.PENDING,
+                created_at__gte=timezone.now() - timedelta(days=7),
+            ).values('id'),
+            'request_status_created_idx',
+        )
+
+    def test_student_requests(self):
+        self.assertUsesIndex(
+            TestRequest.objects.filter(student_id=1).order_by('-created_at'),
+            'request_student_created_idx',
+        )
+
+    def test_completed_tests(self):
+        self.assertUsesIndex(
+            PersonalizedTest.objects.filter(status=PersonalizedTest.Status.COMPLETED).order_by('-completed_at'),
+            'test_status_completed_idx',
+        )
+
+    def test_recent_recommendations(self):
+        self.assertUsesIndex(CareerRecommendation.objects.order_by('-created_at')[:20], 'recommendation_created_idx')
+
+    def test_answer_counts(self):
+        self.assertUsesIndex(
+            StudentAnswer.objects.filter(student_id=1, personalized_test_id=1).values('question_id'),
+            'answer_student_test_question_uniq',
+            sqlite_index='(student_id=? AND personalized_test_id=?)',
+        )
+
+    def test_active_companies(self):
+        self.assertUsesIndex(
+            Company.objects.filter(is_active=True, category_id=1).order_by('category', 'name'),
+            'company_active_name_idx',
+        )
+
+    def test_active_question_templates(self):
+        self.assertUsesIndex(
+            QuestionTemplate.objects.filter(is_active=True, category_id=1).order_by('order', 'id'),
+            'template_active_order_idx',
+        )
+
+    def test_active_resources(self):
+        self.assertUsesIndex(
+            CareerResource.objects.filter(is_active=True).order_by('order', 'created_at'),
+            'resource_active_order_idx',
+        )
+
+
+@override_settings(
+    READ_REPLICAS=['replica'],
+    REPLICA_PIN_SECONDS=10,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+        self.user = User(id=7, email='reader@example.com')
+
+    def read_alias(self, method='get', model=TestRequest):
+        """Run a request through the middleware and return where a read inside it goes."""
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(model))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)('/api/student/test-requests/')
+        request.user = self.user
+        ReplicaRoutingMiddleware(view)(request)
+        return seen[0]
+
+    def test_safe_requests_read_from_the_replica(self):
+        self.assertEqual(self.read_alias(), 'replica')
+
+    def test_unsafe_requests_read_from_the_primary(self):
+        self.assertEqual(self.read_alias('post'), 'default')
+
+    def test_writer_is_pinned_to_the_primary(self):
+        self.read_alias('post')
+        self.assertEqual(self.read_alias(), 'default')
+        cache.clear()
+        self.assertEqual(self.read_alias(), 'replica')
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(TestRequest), 'default')
+
+    @override_settings(READ_REPLICAS=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        self.assertEqual(self.read_alias(), 'default')
+
+    def test_cache_table_is_read_on_the_primary(self):
+        self.assertEqual(self.read_alias(model=DatabaseCache('django_cache', {}).cache_model_class), 'default')
+
+    def test_per_process_caches_are_reported(self):
+        self.assertEqual([error.id for error in check_replica_cache(None)], ['core.E001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache'}}):
+            self.assertEqual(check_replica_cache(None), [])
+        with override_settings(READ_REPLICAS=[]):
+            self.assertEqual(check_replica_cache(None), [])
+
+
+class TestTransitionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'password', role=User.Roles.ADMIN)
+        cls.student = User.objects.create_user('student@example.com', 'password')
+        cls.other = User.objects.create_user('other@example.com', 'password')
+
+    def setUp(self):
+        self.request = TestRequest.objects.create(student=self.student)
+        self.test, _ = create_test(self.request, self.admin)
+        Question.objects.create(personalized_test=self.test, prompt='Pick one', order=1)
+
+    def assertStatuses(self, test_status, request_status):
+        self.test.refresh_from_db()
+        self.request.refresh_from_db()
+        self.assertEqual((self.test.status, self.request.status), (test_status, request_status))
+
+    def test_create_returns_the_existing_test(self):
+        test, created = create_test(self.request, self.admin)
+        self.assertFalse(created)
+        self.assertEqual(test, self.test)
+        self.assertStatuses(PersonalizedTest.Status.DRAFT, TestRequest.Status.IN_PROGRESS)
+
+    def test_assign_and_submit(self):
+        assign_test(self.test.id)
+        self.assertStatuses(PersonalizedTest.Status.ASSIGNED, TestRequest.Status.ASSIGNED)
+        self.assertIsNotNone(self.test.assigned_at)
+        question = self.test.questions.get()
+        StudentAnswer.objects.create(
+            student=self.student, personalized_test=self.test, question=question,
+            option=question.options.create(label='A', order=1),
+        )
+        submit_test(self.test.id, self.student)
+        self.assertStatuses(PersonalizedTest.Status.COMPLETED, TestRequest.Status.COMPLETED)
+        self.assertIsNotNone(self.test.completed_at)
+
+    def test_assign_twice_conflicts(self):
+        assign_test(self.test.id)
+        with self.assertRaises(TransitionConflict) as caught:
+            assign_test(self.test.id)
+        self.assertEqual(caught.exception.status, PersonalizedTest.Status.ASSIGNED)
+
+    def test_assign_needs_questions(self):
+        self.test.questions.all().delete()
+        with self.assertRaisesMessage(TransitionError, 'without questions'):
+            assign_test(self.test.id)
+        self.assertStatuses(PersonalizedTest.Status.DRAFT, TestRequest.Status.IN_PROGRESS)
+
+    def test_submit_needs_every_answer(self):
+        assign_test(self.test.id)
+        with self.assertRaisesMessage(TransitionError, '0/1 answered'):
+            submit_test(self.test.id, self.student)
+        self.assertStatuses(PersonalizedTest.Status.ASSIGNED, TestRequest.Status.ASSIGNED)
+
+    def test_submit_is_limited_to_the_owner(self):
+        assign_test(self.test.id)
+        with self.assertRaises(PersonalizedTest.DoesNotExist):
+            submit_test(self.test.id, self.other)
+
+
+class ArchivalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'password', role=User.Roles.ADMIN)
+        cls.student = User.objects.create_user('student@example.com', 'password')
+        cls.test = PersonalizedTest.objects.create(
+            request=TestRequest.objects.create(student=cls.student), status=PersonalizedTest.Status.COMPLETED,
+        )
+        for order in range(1, 4):
+            question = Question.objects.create(personalized_test=cls.test, prompt=f'Question {order}', order=order)
+            options = [Option.objects.create(question=question, label=label, order=index) for index, label in enumerate('ABC')]
+            if order < 3:
+                StudentAnswer.objects.create(
+                    student=cls.student, personalized_test=cls.test, question=question, option=options[order],
+                )
+        PersonalizedTest.objects.filter(id=cls.test.id).update(completed_at=timezone.now() - timedelta(days=400))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def responses(self):
+        return [
+            self.client.get(url).data
+            for url in (
+                f'/api/admin/tests/{self.test.id}/',
+                f'/api/admin/tests/{self.test.id}/answers/',
+                '/api/admin/dashboard/',
+                '/api/admin/tests/completed/',
+            )
+        ]
+
+    def test_responses_are_unchanged_after_archiving(self):
+        before = self.responses()
+        self.assertEqual(before[2]['stats']['mcqs_crafted'], 3)
+        call_command('archive_tests', stdout=io.StringIO())
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(StudentAnswer.objects.exists())
+        self.test.refresh_from_db()
+        self.assertIsNotNone(self.test.archived_at)
+        self.assertEqual(self.responses(), before)
+        call_command('check_test_counters', stdout=io.StringIO())
+
+    def test_batch_writes_counters_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            stats = archive_tests(timezone.now())
+        self.assertEqual((stats['tests'], stats['questions'], stats['options'], stats['answers']), (1, 3, 9, 2))
+        statements = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE "core_personalizedtest"')]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('DELETE')]), 3)
+        self.test.refresh_from_db()
+        self.assertEqual((self.test.questions_count, self.test.answered_count), (3, 2))
+
+    def test_recent_tests_are_kept(self):
+        call_command('archive_tests', older_than_days=500, stdout=io.StringIO())
+        self.assertEqual(Question.objects.count(), 3)
+
+
+class CatalogImporterTests(TestCase):
+    def import_csv(self, kind, text, **kwargs):
+        return import_catalog(kind, io.StringIO(text), 'csv', **kwargs)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        CompanyCategory.objects.create(name='Tech')
+        result = self.import_csv('companies', (
+            'name,email,category_name\n'
+            'Acme,hr@acme.example,Tech\n'
+            'Globex,not-an-email,\n'
+            'Initech,hr@initech.example,Nope\n'
+        ))
+        self.assertEqual((result.created, result.error_count), (1, 2))
+        self.assertEqual([error['row'] for error in result.errors], [3, 4])
+        self.assertIn('email', result.errors[0]['errors'])
+        self.assertIn('category_name', result.errors[1]['errors'])
+        self.assertEqual(Company.objects.get().category.name, 'Tech')
+
+    def test_rows_upsert_by_natural_key(self):
+        self.import_csv('company_categories', 'name,order\nTech,1\n')
+        result = self.import_csv('company_categories', 'name,order\nTech,5\nFinance,2\n', chunk_size=1)
+        self.assertEqual((result.created, result.updated), (1, 1))
+        self.assertEqual(CompanyCategory.objects.get(name='Tech').order, 5)
+
+    def test_dry_run_rolls_back(self):
+        result = self.import_csv('company_categories', 'name\nTech\nFinance\n', dry_run=True)
+        self.assertEqual(result.created, 2)
+        self.assertFalse(CompanyCategory.objects.exists())
+
+    def test_reported_errors_are_capped(self):
+        result = import_catalog('company_categories', io.StringIO('[]\n' * (MAX_REPORTED_ERRORS + 5)), 'ndjson')
+        self.assertEqual(result.error_count, MAX_REPORTED_ERRORS + 5)
+        self.assertEqual(len(result.errors), MAX_REPORTED_ERRORS)
+
+    def test_chunk_size_must_be_positive(self):
+        with self.assertRaisesMessage(ImportFormatError, 'chunk_size'):
+            self.import_csv('company_categories', 'name\nTech\n', chunk_size=0)
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as catalog, self.assertRaises(CommandError):
+            catalog.write('name\nTech\n')
+            catalog.flush()
+            call_command('import_catalog', 'company_categories', catalog.name, chunk_size=0)
+        self.assertFalse(CompanyCategory.objects.exists())
+
+    def test_company_rows_fill_in_recommendation_stubs(self):
+        [stub] = Company.objects.for_names(['Acme Corp'])
+        result = self.import_csv('companies', 'name,email\nacme corp,jobs@acme.example\n')
+        self.assertEqual((result.created, result.updated, result.error_count), (0, 1, 0))
+        stub.refresh_from_db()
+        self.assertEqual((stub.name, stub.email, stub.is_active), ('Acme Corp', 'jobs@acme.example', True))
+
+    def test_company_rows_prefer_the_active_duplicate(self):
+        Company.objects.create(name='ACME CORP', email='old@acme.example', is_active=False)
+        active = Company.objects.create(name='Acme Corp', email='hr@acme.example')
+        self.import_csv('companies', 'name,email,location\nacme corp,hr@acme.example,Pune\n')
+        active.refresh_from_db()
+        self.assertEqual(active.location, 'Pune')
+        self.assertFalse(Company.objects.get(name='ACME CORP').is_active)
+
+
+class ExportJobQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student@example.com', 'password')
+        test_request = TestRequest.objects.create(student=cls.student)
+        personalized_test = PersonalizedTest.objects.create(request=test_request, status=PersonalizedTest.Status.COMPLETED)
+        cls.recommendation = CareerRecommendation.objects.create(
+            personalized_test=personalized_test, career_name='Data Scientist', summary='Analytical.',
+        )
+
+    def running_job(self, started_minutes_ago, attempts=1):
+        job, _ = request_export(self.recommendation, self.student)
+        RecommendationExportJob.objects.filter(id=job.id).update(
+            status=RecommendationExportJob.Status.RUNNING,
+            started_at=timezone.now() - timedelta(minutes=started_minutes_ago),
+            attempts=attempts,
+        )
+        return job
+
+    def test_requests_for_unchanged_content_share_a_job(self):
+        job, created = request_export(self.recommendation, self.student)
+        again, created_again = request_export(self.recommendation, self.student)
+        self.assertEqual((again, created, created_again), (job, True, False))
+        RoadmapStep.objects.create(recommendation=self.recommendation, order=1, title='Learn SQL')
+        changed, created = request_export(self.recommendation, self.student)
+        self.assertNotEqual(changed, job)
+        self.assertTrue(created)
+
+    def test_a_job_is_claimed_once(self):
+        job, _ = request_export(self.recommendation, self.student)
+        claimed = claim_next_job()
+        self.assertEqual((claimed, claimed.status, claimed.attempts), (job, RecommendationExportJob.Status.RUNNING, 1))
+        self.assertIsNone(claim_next_job())
+
+    def test_stale_jobs_are_requeued(self):
+        job = self.running_job(started_minutes_ago=30)
+        self.assertEqual(requeue_stale_jobs(timedelta(minutes=10)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, RecommendationExportJob.Status.PENDING)
+
+    def test_fresh_and_exhausted_jobs_are_not_requeued(self):
+        fresh = self.running_job(started_minutes_ago=1)
+        requeue_stale_jobs(timedelta(minutes=10))
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, RecommendationExportJob.Status.RUNNING)
+        RecommendationExportJob.objects.filter(id=fresh.id).update(
+            started_at=timezone.now() - timedelta(minutes=30), attempts=MAX_ATTEMPTS,
+        )
+        requeue_stale_jobs(timedelta(minutes=10))
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, RecommendationExportJob.Status.FAILED)
+
+    def test_interrupted_renders_are_retried(self):
+        job, _ = request_export(self.recommendation, self.student)
+        with (
+            mock.patch('core.exports.render_recommendation_pdf', side_effect=RenderTimeout('too slow')),
+            self.assertLogs('core.exports', 'WARNING'),
+        ):
+            for _ in range(MAX_ATTEMPTS):
+                self.assertFalse(render_job(claim_next_job()))
+                job.refresh_from_db()
+                if job.attempts < MAX_ATTEMPTS:
+                    self.assertEqual(job.status, RecommendationExportJob.Status.PENDING)
+        self.assertEqual((job.status, job.error), (RecommendationExportJob.Status.FAILED, 'too slow'))
+
+    @override_settings(PDF_RENDER_TIMEOUT=600)
+    def test_worker_requeues_periodically_above_the_render_timeout(self):
+        stop_event = threading.Event()
+        with mock.patch('core.exports.requeue_stale_jobs', return_value=0) as requeue:
+            worker = threading.Thread(target=run_worker, kwargs={
+                'workers': 0,
+                'stale_after': timedelta(seconds=1),
+                'stop_event': stop_event,
+                'requeue_interval': timedelta(seconds=0.05),
+            })
+            worker.start()
+            time.sleep(0.5)
+            stop_event.set()
+            worker.join(timeout=5)
+        self.assertGreater(requeue.call_count, 2)
+        self.assertEqual({call.args[0] for call in requeue.call_args_list}, {min_stale_after()})
+        self.assertGreater(min_stale_after(), timedelta(seconds=600))
+
+
+SETTINGS_PATH = importlib.util.find_spec('career_backend.settings').origin
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def load_settings(self, **env):
+        defaults = {'USE_SQLITE': '0', 'SQLITE_REPLICA_NAME': '', 'POSTGRES_REPLICA_HOST': ''}
+        with mock.patch.dict(os.environ, {**defaults, **env}):
+            return runpy.run_path(SETTINGS_PATH)
+
+    def test_persistent_connections_are_health_checked(self):
+        database = self.load_settings(POSTGRES_POOL='0', POSTGRES_CONN_MAX_AGE='30')['DATABASES']['default']
+        self.assertEqual((database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS']), (30, True))
+        self.assertNotIn('pool', database.get('OPTIONS', {}))
+
+    def test_pooled_connections_are_health_checked(self):
+        database = self.load_settings(POSTGRES_POOL='1', POSTGRES_POOL_MAX_SIZE='4')['DATABASES']['default']
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('CONN_MAX_AGE', database)
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], 4)
+
+    def test_replicas_get_a_shared_cache(self):
+        for env in ({'USE_SQLITE': '1', 'SQLITE_REPLICA_NAME': 'replica.sqlite3'}, {'POSTGRES_REPLICA_HOST': 'replica'}):
+            with self.subTest(env):
+                loaded = self.load_settings(**env)
+                self.assertEqual(loaded['READ_REPLICAS'], ['replica'])
+                self.assertEqual(loaded['CACHES']['default']['BACKEND'], 'django.core.cache.backends.db.DatabaseCache')
+        self.assertNotIn('CACHES', self.load_settings(USE_SQLITE='1'))
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'password', role=User.Roles.ADMIN)
+        cls.student = User.objects.create_user('student@example.com', 'password')
+        cls.other = User.objects.create_user('other@example.com', 'password')
+        own, others = (
+            CareerRecommendation.objects.create(
+                personalized_test=PersonalizedTest.objects.create(request=TestRequest.objects.create(student=student)),
+                career_name=career_name,
+                summary='',
+            )
+            for student, career_name in ((cls.student, 'Data Scientist'), (cls.other, 'Chef'))
+        )
+        cls.general = CareerResource.objects.create(title='Python basics', description='Start here.')
+        cls.own = CareerResource.objects.create(
+            title='Statistics', description='Python for data work.', career_recommendation=own,
+        )
+        CareerResource.objects.create(title='Python kitchen timers', description='', career_recommendation=others)
+        cls.hidden = CareerResource.objects.create(title='Python 2 notes', description='', is_active=False)
+        cls.company = Company.objects.create(name='Pythonic Labs', email='hr@pythonic.example')
+        cls.template = QuestionTemplate.objects.create(
+            category=QuestionCategory.objects.create(name='Aptitude'), prompt='Which Python type is immutable?',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def ids(self, documents):
+        return {(document.kind, document.object_id) for document in documents}
+
+    def results(self, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(result['type'], result['id']) for result in response.data['results']]
+
+    def test_fts_index_follows_writes(self):
+        self.assertEqual(search.search('statist')[0].object_id, self.own.id)
+        # Title matches outrank body matches.
+        self.assertEqual(search.search('python', kinds=['resource'])[-1].object_id, self.own.id)
+
+        self.general.title = 'Rust basics'
+        self.general.save()
+        document = SearchDocument.objects.get(kind='resource', object_id=self.general.id)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH %s', ['rust'])
+            self.assertEqual(cursor.fetchall(), [(document.id,)])
+        self.assertEqual(self.ids(search.search('python basics')), set())
+
+        self.general.delete()
+        self.assertEqual(search.search('rust'), [])
+
+    def test_migration_indexes_existing_rows(self):
+        migration = importlib.import_module('core.migrations.0017_searchdocument')
+        expected = self.ids(search.search('python', active_only=False))
+        SearchDocument.objects.all().delete()
+        self.assertEqual(search.search('python', active_only=False), [])
+        migration.index_existing_rows(apps, mock.Mock(connection=connection))
+        self.assertEqual(self.ids(search.search('python', active_only=False)), expected)
+        self.assertEqual(len(expected), 6)
+
+    def test_students_see_general_and_own_rows(self):
+        self.assertEqual(set(self.results(self.student, q='python')), {
+            ('resource', self.general.id), ('resource', self.own.id),
+        })
+        self.assertEqual(len(self.results(self.other, q='python')), 2)
+        self.assertEqual(len(self.results(self.admin, q='python')), 5)
+        self.assertEqual(len(self.results(self.admin, q='python', include_inactive='1')), 6)
+
+    def test_type_filter(self):
+        self.assertEqual(self.results(self.admin, q='python', type='company,question_template'), [
+            ('company', self.company.id), ('question_template', self.template.id),
+        ])
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/api/search/', {'q': 'python', 'type': 'company'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown type: company', response.data['error'])
+
+    def test_admin_search_is_uncapped_and_keeps_related_fields(self):
+        resources = CareerResource.objects.bulk_create(
+            CareerResource(title=f'Bulk python {number}', description='') for number in range(1005)
+        )
+        search.index_instances(resources)
+        request = RequestFactory().get('/')
+        request.user = self.admin
+
+        def found(model, term):
+            queryset, _ = admin.site._registry[model].get_search_results(request, model.objects.all(), term)
+            return queryset
+
+        self.assertEqual(found(CareerResource, 'bulk pyth').count(), 1005)
+        self.assertEqual(list(found(CareerResource, 'data scientist')), [self.own])
+        self.assertEqual(list(found(QuestionTemplate, 'aptitude')), [self.template])
+        self.assertEqual(found(CareerResource, 'python').count(), 1009)
+
+
+class FileDownloadTests(SimpleTestCase):
+    content = bytes(range(100))
+
+    def download(self, **headers):
+        request = RequestFactory().get('/download/', headers=headers)
+        response = file_download(request, io.BytesIO(self.content), len(self.content), 'v1', 'report.pdf', 'application/pdf')
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_whole_file(self):
+        response, body = self.download()
+        self.assertEqual((response.status_code, body), (200, self.content))
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual((response['ETag'], response['Accept-Ranges']), ('"v1"', 'bytes'))
+        self.assertIn('attachment; filename="report.pdf"', response['Content-Disposition'])
+
+    def test_byte_ranges(self):
+        for header, expected in (
+            ('bytes=10-19', (10, 19)),
+            ('bytes=90-', (90, 99)),
+            ('bytes=95-200', (95, 99)),
+            ('bytes=-5', (95, 99)),
+            ('bytes=-500', (0, 99)),
+        ):
+            with self.subTest(header):
+                response, body = self.download(Range=header)
+                start, end = expected
+                self.assertEqual((response.status_code, body), (206, self.content[start:end + 1]))
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/100')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+
+    def test_unsatisfiable_ranges(self):
+        for header in ('bytes=100-', 'bytes=50-40', 'bytes=-0'):
+            with self.subTest(header):
+                response, body = self.download(Range=header)
+                self.assertEqual((response.status_code, body), (416, b''))
+                self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_unsupported_ranges_get_the_whole_file(self):
+        for header in ('bytes=0-1,5-6', 'items=0-1', 'bytes=-'):
+            with self.subTest(header):
+                response, body = self.download(Range=header)
+                self.assertEqual((response.status_code, body), (200, self.content))
+
+    def test_if_range(self):
+        response, body = self.download(Range='bytes=0-9', **{'If-Range': '"v1"'})
+        self.assertEqual((response.status_code, body), (206, self.content[:10]))
+        # A stale validator means the file changed: send all of it.
+        response, body = self.download(Range='bytes=0-9', **{'If-Range': '"v0"'})
+        self.assertEqual((response.status_code, body), (200, self.content))
+
+    def test_if_none_match(self):
+        for header in ('"v1"', 'W/"v1"', '"v0", "v1"', '*'):
+            with self.subTest(header):
+                response, body = self.download(**{'If-None-Match': header, 'Range': 'bytes=0-9'})
+                self.assertEqual((response.status_code, body), (304, b''))
+                self.assertEqual(response['ETag'], '"v1"')
+        response, body = self.download(**{'If-None-Match': '"v0"'})
+        self.assertEqual((response.status_code, body), (200, self.content))
+
+
+class QuestionTemplateOptionSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.template = QuestionTemplate.objects.create(
+            category=QuestionCategory.objects.create(name='Aptitude'), prompt='Pick one',
+        )
+        cls.a, cls.b, cls.c, cls.d = OptionTemplate.objects.bulk_create(
+            OptionTemplate(question=cls.template, label=label, order=order) for order, label in enumerate('ABCD')
+        )
+
+    def sync(self, options):
+        serializer = QuestionTemplateCreateSerializer(self.template, data={'options': options}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save()
+        # Just the option statements, not the template's own UPDATE or its search document.
+        return [query['sql'] for query in queries.captured_queries if '"core_optiontemplate"' in query['sql']]
+
+    def test_options_are_diffed_in_place(self):
+        statements = self.sync([
+            {'id': self.b.id, 'label': 'B (edited)', 'order': 1},
+            {'label': 'A', 'description': 'Matched by order', 'order': 0},
+            {'id': self.d.id, 'label': 'D', 'order': 3},
+            {'label': 'E', 'order': 4},
+        ])
+        self.assertEqual([sql.split()[0] for sql in statements], ['SELECT', 'DELETE', 'UPDATE', 'INSERT'])
+        delete, bulk_update = statements[1], statements[2]
+        self.assertIn(f'IN ({self.c.id})', delete)
+        # Only the changed columns of the changed rows are written.
+        self.assertIn(f'IN ({self.b.id}, {self.a.id})', bulk_update)
+        self.assertIn('"description" = CASE', bulk_update)
+        self.assertIn('"label" = CASE', bulk_update)
+        self.assertNotIn('"order" = CASE', bulk_update)
+
+        rows = list(self.template.options.values_list('id', 'label', 'description', 'order'))
+        self.assertEqual(rows[:3], [
+            (self.a.id, 'A', 'Matched by order', 0),
+            (self.b.id, 'B (edited)', '', 1),
+            (self.d.id, 'D', '', 3),
+        ])
+        self.assertEqual(rows[3][1:], ('E', '', 4))
+        self.assertNotIn(rows[3][0], {self.a.id, self.b.id, self.c.id, self.d.id})
+
+    def test_unchanged_options_are_not_written(self):
+        statements = self.sync([
+            {'id': option.id, 'label': option.label, 'order': option.order} for option in (self.a, self.b)
+        ] + [{'label': 'C', 'order': 2}, {'label': 'D', 'order': 3}])
+        self.assertEqual([sql.split()[0] for sql in statements], ['SELECT'])
+        self.assertEqual(self.template.options.count(), 4)
+
+    def test_ids_take_precedence_over_order(self):
+        # A moves to order 2; the option sent without an id for order 0 is new.
+        self.sync([{'id': self.a.id, 'label': 'A', 'order': 2}, {'label': 'Z', 'order': 0}])
+        options = list(self.template.options.all())
+        self.assertEqual([option.label for option in options], ['Z', 'A'])
+        self.assertEqual(options[1].id, self.a.id)
+        self.assertNotIn(options[0].id, {self.b.id, self.c.id, self.d.id})
+
+    def test_foreign_option_ids_are_rejected(self):
+        other = QuestionTemplate.objects.create(category=self.template.category, prompt='Other')
+        foreign = OptionTemplate.objects.create(question=other, label='X')
+        for options in ([{'id': foreign.id, 'label': 'X'}], [{'id': self.a.id, 'label': 'A'}] * 2):
+            serializer = QuestionTemplateCreateSerializer(self.template, data={'options': options}, partial=True)
+            self.assertFalse(serializer.is_valid())
+            self.assertIn('options', serializer.errors)
+
+
+class QuestionBulkCreateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'password', role=User.Roles.ADMIN)
+        cls.test = PersonalizedTest.objects.create(
+            request=TestRequest.objects.create(student=User.objects.create_user('student@example.com', 'password')),
+        )
+        Question.objects.create(personalized_test=cls.test, prompt='Existing', order=3)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def post(self, questions):
+        return self.client.post(f'/api/admin/tests/{self.test.id}/questions/bulk/', {'questions': questions}, format='json')
+
+    def question(self, prompt, **fields):
+        return {'prompt': prompt, 'options': [{'label': 'Yes', 'order': 1}, {'label': 'No', 'order': 2}], **fields}
+
+    def test_batch_is_inserted_in_order(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post([self.question('First'), self.question('Pinned', order=10), self.question('Last')])
+        self.assertEqual(response.status_code, 201, response.data)
+        tables = [query['sql'].split()[2] for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual([table for table in tables if table in ('"core_question"', '"core_option"')], [
+            '"core_question"', '"core_option"',
+        ])
+
+        questions = list(self.test.questions.prefetch_related('options'))
+        self.assertEqual([(question.prompt, question.order) for question in questions], [
+            ('Existing', 3), ('Pinned', 10), ('First', 11), ('Last', 12),
+        ])
+        self.assertEqual(response.data['question_ids'], [questions[2].id, questions[1].id, questions[3].id])
+        self.assertEqual([option.label for option in questions[1].options.all()], ['Yes', 'No'])
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.questions_count, 4)
+
+    def test_invalid_item_creates_nothing(self):
+        response = self.post([self.question('Fine'), {'prompt': 'No options'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['questions'][1], {'options': ['This field is required.']})
+        self.assertEqual(self.test.questions.count(), 1)
+
+    def test_failed_insert_rolls_back(self):
+        bulk_create = QuerySet.bulk_create
+
+        def fail_on_options(queryset, objs, *args, **kwargs):
+            if queryset.model is Option:
+                raise IntegrityError('option insert failed')
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'bulk_create', fail_on_options), self.assertRaises(IntegrityError):
+            self.post([self.question('Fine')])
+        self.assertEqual(self.test.questions.count(), 1)
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.questions_count, 1)
+
+
+class ReorderViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'password', role=User.Roles.ADMIN)
+        student = User.objects.create_user('student@example.com', 'password')
+        cls.test, other = (
+            PersonalizedTest.objects.create(request=TestRequest.objects.create(student=student)) for _ in range(2)
+        )
+        cls.questions = [
+            Question.objects.create(personalized_test=cls.test, prompt=f'Question {order}', order=order)
+            for order in range(1, 4)
+        ]
+        cls.foreign = Question.objects.create(personalized_test=other, prompt='Elsewhere', order=1)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def reorder(self, ids, url=None):
+        return self.client.post(url or f'/api/admin/tests/{self.test.id}/questions/reorder/', {'ids': ids}, format='json')
+
+    def orders(self):
+        return list(self.test.questions.values_list('id', flat=True))
+
+    def test_invalid_id_lists_are_rejected(self):
+        first, second, third = (question.id for question in self.questions)
+        for ids, error in (
+            ('1,2,3', 'ids must be a list of integers.'),
+            ([first, second, str(third)], 'ids must be a list of integers.'),
+            ([first, second, third, first], 'ids must not contain duplicates.'),
+            ([third, second], 'ids must list every item of the parent exactly once.'),
+            ([third, second, first, self.foreign.id], 'ids must list every item of the parent exactly once.'),
+        ):
+            with self.subTest(ids):
+                response = self.reorder(ids)
+                self.assertEqual((response.status_code, response.data['error']), (400, error))
+        response = self.reorder([third, second, self.foreign.id])
+        self.assertEqual((response.data['unknown_ids'], response.data['missing_ids']), ([self.foreign.id], [first]))
+        self.assertEqual(self.orders(), [first, second, third])
+
+    def test_unknown_parent_and_students_are_refused(self):
+        self.assertEqual(self.reorder([], url='/api/admin/tests/999/questions/reorder/').status_code, 403)
+        self.client.force_authenticate(self.test.request.student)
+        self.assertEqual(self.reorder([question.id for question in self.questions]).status_code, 403)
+
+    def test_changed_rows_are_locked_and_updated_once(self):
+        first, second, third = (question.id for question in self.questions)
+        select_for_update = QuerySet.select_for_update
+        locked = []
+
+        def record_lock(queryset, *args, **kwargs):
+            locked.append((queryset.model, connection.in_atomic_block))
+            return select_for_update(queryset, *args, **kwargs)
+
+        with (
+            mock.patch.object(QuerySet, 'select_for_update', record_lock),
+            CaptureQueriesContext(connection) as queries,
+        ):
+            response = self.reorder([first, third, second])
+        self.assertEqual((response.status_code, response.data['updated']), (200, 2))
+        self.assertEqual(locked, [(Question, True)])
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn(f'IN ({third}, {second})', updates[0])
+        self.assertEqual(self.orders(), [first, third, second])
+
+    def test_inactive_children_are_left_out(self):
+        category = QuestionCategory.objects.create(name='Aptitude')
+        active, inactive, last = (
+            QuestionTemplate.objects.create(category=category, prompt=prompt, order=order, is_active=prompt != 'Hidden')
+            for order, prompt in enumerate(('Shown', 'Hidden', 'Also shown'), start=1)
+        )
+        url = f'/api/admin/question-categories/{category.id}/templates/reorder/'
+        self.assertEqual(self.reorder([last.id, inactive.id, active.id], url=url).status_code, 400)
+        response = self.reorder([last.id, active.id], url=url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            dict(QuestionTemplate.objects.filter(category=category).values_list('prompt', 'order')),
+            {'Also shown': 1, 'Shown': 2, 'Hidden': 2},
+        )
@@ -0,0 +1,88 @@
+"""
+Status transitions of test requests and personalized tests.
+
+Each transition is a conditional ``UPDATE ... WHERE status = <expected>``
+that writes only the columns it changes, followed by the matching update of
+the TestRequest, in one transaction. A test that is no longer in the expected
+status (typically because a concurrent request moved it first) raises
+TransitionConflict instead of being overwritten; only then is the row read
+back to report why.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PersonalizedTest, TestRequest
+
+
+class TransitionError(Exception):
+    """The transition does not apply to the test as it is now."""
+
+
+class TransitionConflict(TransitionError):
+    """The test is not in the status the transition starts from."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def create_test(test_request, admin):
+    """
+    Return ``(test, created)``. Concurrent calls for one request get the same
+    draft test: the one-to-one constraint lets only the first INSERT through.
+    """
+    with transaction.atomic():
+        test, created = PersonalizedTest.objects.get_or_create(
+            request=test_request,
+            defaults={'status': PersonalizedTest.Status.DRAFT, 'admin': admin},
+        )
+        if created:
+            TestRequest.objects.filter(id=test_request.id).update(
+                status=TestRequest.Status.IN_PROGRESS,
+                updated_at=timezone.now(),
+            )
+    return test, created
+
+
+def _move_request(test_id, status, now):
+    TestRequest.objects.filter(personalized_test__id=test_id).update(status=status, updated_at=now)
+
+
+def assign_test(test_id):
+    """Move a draft test with questions to ASSIGNED. Raises PersonalizedTest.DoesNotExist."""
+    now = timezone.now()
+    with transaction.atomic():
+        assigned = PersonalizedTest.objects.filter(
+            id=test_id,
+            status=PersonalizedTest.Status.DRAFT,
+            questions_count__gt=0,
+        ).update(status=PersonalizedTest.Status.ASSIGNED, assigned_at=now)
+        if not assigned:
+            test = PersonalizedTest.objects.only('status', 'questions_count').get(id=test_id)
+            if test.status != PersonalizedTest.Status.DRAFT:
+                raise TransitionConflict(f'Test is already {test.get_status_display().lower()}.', test.status)
+            raise TransitionError('Cannot assign test without questions.')
+        _move_request(test_id, TestRequest.Status.ASSIGNED, now)
+
+
+def submit_test(test_id, student):
+    """
+    Move the student's fully answered ASSIGNED test to COMPLETED.
+    Raises PersonalizedTest.DoesNotExist for tests of other students.
+    """
+    now = timezone.now()
+    tests = PersonalizedTest.objects.filter(id=test_id, request__student=student)
+    with transaction.atomic():
+        submitted = tests.filter(
+            status=PersonalizedTest.Status.ASSIGNED,
+            answered_count__gte=F('questions_count'),
+        ).update(status=PersonalizedTest.Status.COMPLETED, completed_at=now)
+        if not submitted:
+            test = tests.only('status', 'questions_count', 'answered_count').get()
+            if test.status != PersonalizedTest.Status.ASSIGNED:
+                raise TransitionConflict('Test is not available for submission.', test.status)
+            raise TransitionError(
+                f'Please answer all questions. {test.answered_count}/{test.questions_count} answered.'
+            )
+        _move_request(test_id, TestRequest.Status.COMPLETED, now)
@@ -2,6 +2,7 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
+    AdminCatalogImportView,
     AdminCompletedTestsListView,
     AdminCompanyCategoryDetailView,
     AdminCompanyCategoryListView,
@@ -9,20 +10,30 @@ from .views import (
     AdminCompanyListView,
     AdminCreateRecommendationView,
     AdminDashboardView,
+    AdminDatabaseConnectionsView,
     AdminJobRecommendationDetailView,
     AdminJobRecommendationListView,
+    AdminJobRecommendationReorderView,
+    AdminOptionReorderView,
+    AdminOptionTemplateReorderView,
     AdminPersonalizedTestCreateView,
     AdminPersonalizedTestDetailView,
+    AdminQuestionBulkCreateView,
     AdminQuestionCategoryDetailView,
     AdminQuestionCategoryListView,
     AdminQuestionTemplateDetailView,
     AdminQuestionTemplateListView,
     AdminQuestionCreateView,
+    AdminQuestionReorderView,
+    AdminQuestionTemplateReorderView,
+    AdminRecommendationCohortExportView,
     AdminRecommendationsListView,
     AdminResourceCategoryDetailView,
     AdminResourceCategoryListView,
     AdminResourceDetailView,
     AdminResourceListView,
+    AdminResourceReorderView,
+    AdminRoadmapStepReorderView,
     AdminTestAnswersView,
     AdminTestAssignView,
     AdminTestByRequestView,
@@ -30,9 +41,13 @@ from .views import (
     AdminTestRequestListView,
     CurrentUserView,
     CustomTokenObtainPairView,
+    SearchView,
     StudentAnswerSubmitView,
     StudentDashboardView,
+    StudentExportJobDetailView,
+    StudentExportJobDownloadView,
     StudentMyResourcesView,
+    StudentRecommendationExportJobView,
     StudentRecommendationExportView,
     StudentRegistrationView,
     StudentRecommendationsView,
@@ -51,6 +66,7 @@ urlpatterns = [
     path('auth/token/', CustomTokenObtainPairView.as_view(), name='token-obtain'),
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
     path('auth/me/', CurrentUserView.as_view(), name='current-user'),
+    path('search/', SearchView.as_view(), name='search'),
     path('student/dashboard/', StudentDashboardView.as_view(), name='student-dashboard'),
     path('student/test-requests/', StudentTestRequestView.as_view(), name='student-test-requests'),
     path('student/tests/', StudentTestListView.as_view(), name='student-test-list'),
@@ -59,22 +75,28 @@ urlpatterns = [
     path('student/tests/<int:test_id>/submit/', StudentTestSubmitView.as_view(), name='student-submit-test'),
     path('student/recommendations/', StudentRecommendationsView.as_view(), name='student-recommendations'),
     path('student/recommendations/<int:recommendation_id>/export/', StudentRecommendationExportView.as_view(), name='student-export-recommendation'),
+    path('student/recommendations/<int:recommendation_id>/export-jobs/', StudentRecommendationExportJobView.as_view(), name='student-create-export-job'),
+    path('student/export-jobs/<int:job_id>/', StudentExportJobDetailView.as_view(), name='student-export-job-detail'),
+    path('student/export-jobs/<int:job_id>/download/', StudentExportJobDownloadView.as_view(), name='student-export-job-download'),
     path('student/resources/', StudentResourceListView.as_view(), name='student-resources'),
     path('student/resources/<int:pk>/', StudentResourceDetailView.as_view(), name='student-resource-detail'),
     path('student/resources/<int:resource_id>/progress/', StudentResourceProgressView.as_view(), name='student-resource-progress'),
     path('student/my-resources/', StudentMyResourcesView.as_view(), name='student-my-resources'),
     path('admin/dashboard/', AdminDashboardView.as_view(), name='admin-dashboard'),
+    path('admin/db-connections/', AdminDatabaseConnectionsView.as_view(), name='admin-db-connections'),
     path('admin/test-requests/', AdminTestRequestListView.as_view(), name='admin-test-requests'),
     path('admin/test-requests/<int:request_id>/create-test/', AdminPersonalizedTestCreateView.as_view(), name='admin-create-test'),
     path('admin/test-requests/<int:request_id>/test/', AdminTestByRequestView.as_view(), name='admin-test-by-request'),
     path('admin/tests/<int:pk>/', AdminPersonalizedTestDetailView.as_view(), name='admin-test-detail'),
     path('admin/tests/<int:test_id>/questions/', AdminQuestionCreateView.as_view(), name='admin-create-question'),
+    path('admin/tests/<int:test_id>/questions/bulk/', AdminQuestionBulkCreateView.as_view(), name='admin-bulk-create-questions'),
     path('admin/tests/<int:test_id>/add-templates/', AdminTestAddTemplatesView.as_view(), name='admin-add-templates'),
     path('admin/tests/<int:test_id>/assign/', AdminTestAssignView.as_view(), name='admin-assign-test'),
     path('admin/tests/completed/', AdminCompletedTestsListView.as_view(), name='admin-completed-tests'),
     path('admin/tests/<int:test_id>/answers/', AdminTestAnswersView.as_view(), name='admin-test-answers'),
     path('admin/tests/<int:test_id>/recommendation/', AdminCreateRecommendationView.as_view(), name='admin-create-recommendation'),
     path('admin/recommendations/', AdminRecommendationsListView.as_view(), name='admin-recommendations'),
+    path('admin/recommendations/export/', AdminRecommendationCohortExportView.as_view(), name='admin-export-recommendations'),
     path('admin/question-categories/', AdminQuestionCategoryListView.as_view(), name='admin-question-categories'),
     path('admin/question-categories/<int:pk>/', AdminQuestionCategoryDetailView.as_view(), name='admin-question-category-detail'),
     path('admin/question-templates/', AdminQuestionTemplateListView.as_view(), name='admin-question-templates'),
@@ -89,5 +111,13 @@ urlpatterns = [
     path('admin/companies/<int:pk>/', AdminCompanyDetailView.as_view(), name='admin-company-detail'),
     path('admin/job-recommendations/', AdminJobRecommendationListView.as_view(), name='admin-job-recommendations'),
     path('admin/job-recommendations/<int:pk>/', AdminJobRecommendationDetailView.as_view(), name='admin-job-recommendation-detail'),
+    path('admin/tests/<int:parent_id>/questions/reorder/', AdminQuestionReorderView.as_view(), name='admin-reorder-questions'),
+    path('admin/questions/<int:parent_id>/options/reorder/', AdminOptionReorderView.as_view(), name='admin-reorder-options'),
+    path('admin/recommendations/<int:parent_id>/steps/reorder/', AdminRoadmapStepReorderView.as_view(), name='admin-reorder-steps'),
+    path('admin/recommendations/<int:parent_id>/resources/reorder/', AdminResourceReorderView.as_view(), name='admin-reorder-resources'),
+    path('admin/recommendations/<int:parent_id>/job-recommendations/reorder/', AdminJobRecommendationReorderView.as_view(), name='admin-reorder-job-recommendations'),
+    path('admin/question-categories/<int:parent_id>/templates/reorder/', AdminQuestionTemplateReorderView.as_view(), name='admin-reorder-question-templates'),
+    path('admin/question-templates/<int:parent_id>/options/reorder/', AdminOptionTemplateReorderView.as_view(), name='admin-reorder-option-templates'),
+    path('admin/catalog-import/<str:kind>/', AdminCatalogImportView.as_view(), name='admin-catalog-import'),
 ]
 
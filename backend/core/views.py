@@ -1,5 +1,10 @@
-from django.db import models
-from django.http import HttpResponse
+import io
+import os
+
+from django.db import models, transaction
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
 from django.utils import timezone
 from rest_framework import generics, permissions, status
 from rest_framework.exceptions import PermissionDenied, ValidationError
@@ -14,18 +19,28 @@ from .models import (
     CompanyCategory,
     JobRecommendation,
     Option,
+    OptionTemplate,
     PersonalizedTest,
     QuestionCategory,
     QuestionTemplate,
     Question,
+    RecommendationExportJob,
     ResourceCategory,
     RoadmapStep,
+    SearchDocument,
     StudentAnswer,
     StudentResourceProgress,
     TestRequest,
     User,
 )
-from .pdf_generator import generate_recommendation_pdf
+from . import search, transitions
+from .archival import answer_sheet, test_snapshot
+from .db_stats import connection_stats
+from .downloads import file_download
+from .exports import cached_export, cohort_entries, export_filename, iter_cohort_zip, request_export
+from .importers import DEFAULT_CHUNK_SIZE, ImportFormatError, detect_format, import_catalog
+from .rendering import RenderUnavailable
+from .report_formats import EXPORT_FORMATS, FORMAT_ALIASES, PDF, accepted_export_format
 from .serializers import (
     CareerRecommendationCreateSerializer,
     CareerRecommendationSerializer,
@@ -42,6 +57,7 @@ from .serializers import (
     PersonalizedTestSerializer,
     QuestionCreateSerializer,
     QuestionSerializer,
+    RecommendationExportJobSerializer,
     ResourceCategorySerializer,
     StudentAnswerSerializer,
     StudentRegistrationSerializer,
@@ -100,6 +116,7 @@ class StudentDashboardView(APIView):
             test_data = PersonalizedTestSerializer(personalized_test).data
             recommendation = getattr(personalized_test, 'recommendation', None)
             if recommendation:
+                models.prefetch_related_objects([recommendation], 'steps', 'company_links__company')
                 recommendation_data = CareerRecommendationSerializer(recommendation).data
         return Response(
             {
@@ -132,11 +149,14 @@ class AdminDashboardView(APIView):
             created_at__gte=week_ago
         ).count()
         
-        # Total MCQs (questions) crafted
-        total_questions = Question.objects.count()
-        questions_this_month = Question.objects.filter(
-            personalized_test__request__created_at__gte=month_ago
-        ).count()
+        # Total MCQs (questions) crafted, from the counters: archived tests
+        # keep their questions_count after their Question rows are deleted.
+        questions = PersonalizedTest.objects.aggregate(
+            total=models.Sum('questions_count', default=0),
+            this_month=models.Sum('questions_count', filter=models.Q(request__created_at__gte=month_ago), default=0),
+        )
+        total_questions = questions['total']
+        questions_this_month = questions['this_month']
         
         # Recommendations sent
         total_recommendations = CareerRecommendation.objects.count()
@@ -155,8 +175,7 @@ class AdminDashboardView(APIView):
             test = None
             if hasattr(req, 'personalized_test'):
                 test = req.personalized_test
-                questions_count = test.questions.count()
-                status_text = 'Questions drafted' if questions_count > 0 else 'Need review'
+                status_text = 'Questions drafted' if test.questions_count > 0 else 'Need review'
             else:
                 status_text = 'Need review'
             
@@ -197,6 +216,16 @@ class AdminDashboardView(APIView):
         })
 
 
+class AdminDatabaseConnectionsView(APIView):
+    """Connection reuse settings and pool wait/checkout counters for this worker."""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        if request.user.role != User.Roles.ADMIN:
+            raise PermissionDenied("Only admins can view database connection stats.")
+        return Response(connection_stats())
+
+
 class AdminTestRequestListView(generics.ListAPIView):
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = TestRequestSerializer
@@ -221,15 +250,9 @@ class AdminPersonalizedTestCreateView(APIView):
             test_request = TestRequest.objects.get(id=request_id)
         except TestRequest.DoesNotExist:
             raise PermissionDenied("Test request not found.")
-        if hasattr(test_request, 'personalized_test'):
-            return Response({'message': 'Test already exists.', 'test': PersonalizedTestSerializer(test_request.personalized_test).data})
-        personalized_test = PersonalizedTest.objects.create(
-            request=test_request,
-            status=PersonalizedTest.Status.DRAFT,
-            admin=request.user
-        )
-        test_request.status = TestRequest.Status.IN_PROGRESS
-        test_request.save()
+        personalized_test, created = transitions.create_test(test_request, request.user)
+        if not created:
+            return Response({'message': 'Test already exists.', 'test': PersonalizedTestSerializer(personalized_test).data})
         return Response({'message': 'Test created successfully.', 'test': PersonalizedTestSerializer(personalized_test).data}, status=201)
 
 
@@ -275,6 +298,29 @@ class AdminQuestionCreateView(generics.CreateAPIView):
         return question
 
 
+class AdminQuestionBulkCreateView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, test_id):
+        if request.user.role != User.Roles.ADMIN:
+            raise PermissionDenied("Only admins can create questions.")
+        try:
+            test = PersonalizedTest.objects.get(id=test_id)
+        except PersonalizedTest.DoesNotExist:
+            raise PermissionDenied("Test not found.")
+        questions = request.data.get('questions') if isinstance(request.data, dict) else request.data
+        if not isinstance(questions, list) or not questions:
+            return Response({'error': 'Provide a non-empty "questions" list.'}, status=400)
+        serializer = QuestionCreateSerializer(data=questions, many=True)
+        if not serializer.is_valid():
+            return Response({'questions': serializer.errors}, status=400)
+        created = serializer.save(personalized_test=test)
+        return Response({
+            'message': 'Questions created successfully.',
+            'question_ids': [question.id for question in created],
+        }, status=201)
+
+
 class AdminTestAssignView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
@@ -282,15 +328,16 @@ class AdminTestAssignView(APIView):
         if request.user.role != User.Roles.ADMIN:
             raise PermissionDenied("Only admins can assign tests.")
         try:
-            test = PersonalizedTest.objects.get(id=test_id)
+            transitions.assign_test(test_id)
         except PersonalizedTest.DoesNotExist:
             raise PermissionDenied("Test not found.")
-        if test.questions.count() == 0:
-            return Response({'error': 'Cannot assign test without questions.'}, status=400)
-        test.status = PersonalizedTest.Status.ASSIGNED
-        test.request.status = TestRequest.Status.ASSIGNED
-        test.save()
-        test.request.save()
+        except transitions.TransitionConflict as exc:
+            return Response({'error': str(exc), 'status': exc.status}, status=409)
+        except transitions.TransitionError as exc:
+            return Response({'error': str(exc)}, status=400)
+        test = PersonalizedTest.objects.select_related('request', 'request__student').prefetch_related(
+            'questions__options'
+        ).get(id=test_id)
         return Response({'message': 'Test assigned successfully.', 'test': PersonalizedTestSerializer(test).data})
 
 
@@ -310,11 +357,8 @@ class StudentTestListView(APIView):
                     'id': test.id,
                     'request_id': test.request.id,
                     'created_at': test.request.created_at,
-                    'questions_count': test.questions.count(),
-                    'answered_count': StudentAnswer.objects.filter(
-                        student=request.user,
-                        question__personalized_test=test
-                    ).count(),
+                    'questions_count': test.questions_count,
+                    'answered_count': test.answered_count,
                 }
                 for test in tests
             ]
@@ -336,9 +380,11 @@ class StudentTestDetailView(APIView):
             raise PermissionDenied("Test not found.")
         if test.status != PersonalizedTest.Status.ASSIGNED:
             return Response({'error': 'Test is not available for taking.'}, status=400)
+        selected_options = dict(
+            StudentAnswer.objects.filter(student=request.user, personalized_test=test).values_list('question_id', 'option_id')
+        )
         questions_data = []
         for question in test.questions.all():
-            answer = StudentAnswer.objects.filter(student=request.user, question=question).first()
             questions_data.append({
                 'id': question.id,
                 'prompt': question.prompt,
@@ -352,7 +398,7 @@ class StudentTestDetailView(APIView):
                     }
                     for option in question.options.all()
                 ],
-                'selected_option_id': answer.option.id if answer and answer.option else None,
+                'selected_option_id': selected_options.get(question.id),
             })
         return Response({
             'test': {
@@ -360,10 +406,7 @@ class StudentTestDetailView(APIView):
                 'request_id': test.request.id,
                 'questions': sorted(questions_data, key=lambda x: x['order']),
                 'total_questions': len(questions_data),
-                'answered_count': StudentAnswer.objects.filter(
-                    student=request.user,
-                    question__personalized_test=test
-                ).count(),
+                'answered_count': len(selected_options),
             }
         })
 
@@ -391,6 +434,7 @@ class StudentAnswerSubmitView(APIView):
             return Response({'error': 'Invalid question or option.'}, status=400)
         answer, created = StudentAnswer.objects.update_or_create(
             student=request.user,
+            personalized_test=test,
             question=question,
             defaults={'option': option}
         )
@@ -410,25 +454,16 @@ class StudentTestSubmitView(APIView):
         if request.user.role != User.Roles.STUDENT:
             raise PermissionDenied("Only students can submit tests.")
         try:
-            test = PersonalizedTest.objects.get(id=test_id, request__student=request.user)
+            transitions.submit_test(test_id, request.user)
         except PersonalizedTest.DoesNotExist:
             raise PermissionDenied("Test not found.")
-        if test.status != PersonalizedTest.Status.ASSIGNED:
-            return Response({'error': 'Test is not available for submission.'}, status=400)
-        total_questions = test.questions.count()
-        answered_count = StudentAnswer.objects.filter(
-            student=request.user,
-            question__personalized_test=test
-        ).count()
-        if answered_count < total_questions:
-            return Response({
-                'error': f'Please answer all questions. {answered_count}/{total_questions} answered.'
-            }, status=400)
-        test.status = PersonalizedTest.Status.COMPLETED
-        test.completed_at = timezone.now()
-        test.request.status = TestRequest.Status.COMPLETED
-        test.save()
-        test.request.save()
+        except transitions.TransitionConflict as exc:
+            return Response({'error': str(exc), 'status': exc.status}, status=409)
+        except transitions.TransitionError as exc:
+            return Response({'error': str(exc)}, status=400)
+        test = PersonalizedTest.objects.select_related('request', 'request__student').prefetch_related(
+            'questions__options'
+        ).get(id=test_id)
         return Response({
             'message': 'Test submitted successfully.',
             'test': PersonalizedTestSerializer(test).data
@@ -444,7 +479,7 @@ class StudentRecommendationsView(APIView):
         recommendations = CareerRecommendation.objects.filter(
             personalized_test__request__student=request.user
         ).select_related('personalized_test', 'personalized_test__request').prefetch_related(
-            'steps', 'resources', 'resources__category', 'resources__student_progress'
+            'steps', 'company_links__company', 'resources', 'resources__category', 'resources__student_progress'
         ).order_by('-created_at')
         
         # Use serializer to get resources included
@@ -468,6 +503,11 @@ class AdminRecommendationsListView(APIView):
         recommendations = CareerRecommendation.objects.select_related(
             'personalized_test', 'personalized_test__request', 'personalized_test__request__student'
         ).order_by('-created_at')
+        company_id = request.query_params.get('company')
+        if company_id:
+            if not company_id.isdigit():
+                return Response({'error': 'company must be a company id.'}, status=400)
+            recommendations = recommendations.filter(company_links__company_id=company_id)
         return Response({
             'recommendations': [
                 {
@@ -481,6 +521,44 @@ class AdminRecommendationsListView(APIView):
         })
 
 
+class AdminRecommendationCohortExportView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        if request.user.role != User.Roles.ADMIN:
+            raise PermissionDenied("Only admins can export recommendations.")
+        recommendations = CareerRecommendation.objects.all()
+
+        for param, lookup in (('created_from', 'created_at__date__gte'), ('created_to', 'created_at__date__lte')):
+            value = request.query_params.get(param)
+            if value:
+                parsed = parse_date(value)
+                if parsed is None:
+                    return Response({'error': f'{param} must be a YYYY-MM-DD date.'}, status=400)
+                recommendations = recommendations.filter(**{lookup: parsed})
+
+        career_name = request.query_params.get('career_name')
+        if career_name:
+            recommendations = recommendations.filter(career_name__icontains=career_name)
+
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                recommendations = recommendations.filter(id__in=[int(value) for value in ids.split(',') if value.strip()])
+            except ValueError:
+                return Response({'error': 'ids must be a comma-separated list of integers.'}, status=400)
+
+        if not recommendations.exists():
+            return Response({'error': 'No recommendations match the filter.'}, status=404)
+
+        response = StreamingHttpResponse(
+            iter_cohort_zip(cohort_entries(recommendations), workers=settings.PDF_RENDER_WORKERS),
+            content_type='application/zip',
+        )
+        response['Content-Disposition'] = f'attachment; filename="CareerPath_Recommendations_{timezone.now():%Y%m%d}.zip"'
+        return response
+
+
 class AdminCompletedTestsListView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
@@ -489,7 +567,7 @@ class AdminCompletedTestsListView(APIView):
             raise PermissionDenied("Only admins can view completed tests.")
         tests = PersonalizedTest.objects.filter(
             status=PersonalizedTest.Status.COMPLETED
-        ).select_related('request', 'request__student').prefetch_related('questions').order_by('-completed_at')
+        ).select_related('request', 'request__student').order_by('-completed_at')
         return Response({
             'tests': [
                 {
@@ -501,7 +579,7 @@ class AdminCompletedTestsListView(APIView):
                         'interests': test.request.interests_snapshot,
                     },
                     'completed_at': test.completed_at,
-                    'questions_count': test.questions.count(),
+                    'questions_count': test.questions_count,
                     'has_recommendation': hasattr(test, 'recommendation'),
                 }
                 for test in tests
@@ -516,35 +594,14 @@ class AdminTestAnswersView(APIView):
         if request.user.role != User.Roles.ADMIN:
             raise PermissionDenied("Only admins can view test answers.")
         try:
-            test = PersonalizedTest.objects.prefetch_related(
-                'questions', 'questions__options', 'questions__answers', 'questions__answers__option'
+            test = PersonalizedTest.objects.select_related('request', 'request__student').prefetch_related(
+                'questions__options', 'answers'
             ).get(id=test_id, status=PersonalizedTest.Status.COMPLETED)
         except PersonalizedTest.DoesNotExist:
             raise PermissionDenied("Test not found or not completed.")
         student = test.request.student
-        answers_data = []
-        for question in test.questions.all().order_by('order'):
-            answer = StudentAnswer.objects.filter(student=student, question=question).first()
-            answers_data.append({
-                'question': {
-                    'id': question.id,
-                    'prompt': question.prompt,
-                    'order': question.order,
-                },
-                'options': [
-                    {
-                        'id': option.id,
-                        'label': option.label,
-                        'description': option.description,
-                        'order': option.order,
-                    }
-                    for option in question.options.all().order_by('order')
-                ],
-                'selected_answer': {
-                    'option_id': answer.option.id if answer and answer.option else None,
-                    'option_label': answer.option.label if answer and answer.option else None,
-                } if (answer and answer.option) else None,
-            })
+        # Archived tests are served from their snapshot; see core.archival.
+        answers_data = answer_sheet(test_snapshot(test))
         return Response({
             'test': {
                 'id': test.id,
@@ -578,6 +635,7 @@ class AdminCreateRecommendationView(APIView):
                 personalized_test=test,
                 admin=request.user
             )
+            models.prefetch_related_objects([recommendation], 'company_links__company')
             return Response({
                 'message': 'Recommendation created successfully.',
                 'recommendation': CareerRecommendationSerializer(recommendation).data
@@ -586,8 +644,24 @@ class AdminCreateRecommendationView(APIView):
 
 
 class StudentRecommendationExportView(APIView):
+    """
+    Export a recommendation as PDF, HTML, Markdown or JSON, chosen by
+    ``?format=``. Without it the export is a PDF unless the Accept header
+    asks for nothing but export types; see accepted_export_format().
+    """
     permission_classes = (permissions.IsAuthenticated,)
 
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= and Accept pick the export format here, not a DRF renderer;
+        # error responses still render as JSON.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get_export_format(self, request):
+        requested = request.query_params.get('format')
+        if requested:
+            return EXPORT_FORMATS.get(FORMAT_ALIASES.get(requested, requested))
+        return accepted_export_format(request.META.get('HTTP_ACCEPT', '')) or PDF
+
     def get(self, request, recommendation_id):
         if request.user.role != User.Roles.STUDENT:
             raise PermissionDenied("Only students can export their recommendations.")
@@ -601,17 +675,83 @@ class StudentRecommendationExportView(APIView):
         except CareerRecommendation.DoesNotExist:
             raise PermissionDenied("Recommendation not found.")
         
-        student = recommendation.personalized_test.request.student
+        export_format = self.get_export_format(request)
+        if export_format is None:
+            return Response({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}."}, status=400)
         
-        # Generate PDF
-        pdf_buffer = generate_recommendation_pdf(recommendation, student)
+        student = recommendation.personalized_test.request.student
         
-        # Create HTTP response with PDF
-        response = HttpResponse(pdf_buffer.read(), content_type='application/pdf')
-        filename = f"CareerPath_Recommendation_{recommendation.career_name.replace(' ', '_')}_{recommendation.created_at.strftime('%Y%m%d')}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Render once per content version; repeat and resumed downloads hit the cache
+        try:
+            path, fingerprint = cached_export(recommendation, student, export_format)
+        except RenderUnavailable as exc:
+            return Response({'error': str(exc)}, status=503)
         
-        return response
+        export_file = open(path, 'rb')
+        return file_download(
+            request,
+            export_file,
+            size=os.fstat(export_file.fileno()).st_size,
+            etag=fingerprint if export_format == PDF else f"{fingerprint}-{export_format.name}",
+            filename=export_filename(recommendation, export_format.extension),
+            content_type=export_format.media_type if export_format == PDF else f"{export_format.media_type}; charset=utf-8",
+        )
+
+
+class StudentRecommendationExportJobView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, recommendation_id):
+        if request.user.role != User.Roles.STUDENT:
+            raise PermissionDenied("Only students can export their recommendations.")
+        try:
+            recommendation = CareerRecommendation.objects.select_related(
+                'personalized_test', 'personalized_test__request', 'personalized_test__request__student'
+            ).prefetch_related('steps').get(
+                id=recommendation_id,
+                personalized_test__request__student=request.user
+            )
+        except CareerRecommendation.DoesNotExist:
+            raise PermissionDenied("Recommendation not found.")
+        job, created = request_export(recommendation, request.user)
+        return Response(
+            {'job': RecommendationExportJobSerializer(job, context={'request': request}).data},
+            status=202 if created else 200,
+        )
+
+
+class StudentExportJobDetailView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_job(self, request, job_id):
+        if request.user.role != User.Roles.STUDENT:
+            raise PermissionDenied("Only students can view their exports.")
+        try:
+            return RecommendationExportJob.objects.select_related('recommendation').get(
+                id=job_id,
+                recommendation__personalized_test__request__student=request.user,
+            )
+        except RecommendationExportJob.DoesNotExist:
+            raise PermissionDenied("Export job not found.")
+
+    def get(self, request, job_id):
+        job = self.get_job(request, job_id)
+        return Response({'job': RecommendationExportJobSerializer(job, context={'request': request}).data})
+
+
+class StudentExportJobDownloadView(StudentExportJobDetailView):
+    def get(self, request, job_id):
+        job = self.get_job(request, job_id)
+        if job.status != RecommendationExportJob.Status.SUCCEEDED:
+            return Response({'error': 'Export is not ready yet.', 'status': job.status}, status=409)
+        return file_download(
+            request,
+            job.file.open('rb'),
+            size=job.file.size,
+            etag=job.fingerprint,
+            filename=export_filename(job.recommendation),
+            content_type='application/pdf',
+        )
 
 
 # ========== RESOURCE MANAGEMENT VIEWS ==========
@@ -770,7 +910,7 @@ class AdminTestAddTemplatesView(APIView):
         if request.user.role != User.Roles.ADMIN:
             raise PermissionDenied("Only admins can add templates to tests.")
         try:
-            test = PersonalizedTest.objects.select_related('request', 'request__student').prefetch_related('questions').get(id=test_id)
+            test = PersonalizedTest.objects.get(id=test_id)
         except PersonalizedTest.DoesNotExist:
             raise PermissionDenied("Test not found.")
 
@@ -787,41 +927,166 @@ class AdminTestAddTemplatesView(APIView):
             filters |= models.Q(id__in=template_ids)
         templates_qs = templates_qs.filter(filters).prefetch_related('options')
 
-        existing_template_ids = set(
-            test.questions.exclude(template__isnull=True).values_list('template_id', flat=True)
-        )
-        next_order = test.questions.aggregate(max_order=models.Max('order')).get('max_order') or 0
-
-        created_questions = 0
-        for template in templates_qs.order_by('order', 'id'):
-            if template.id in existing_template_ids:
-                continue
-            next_order += 1
-            question = Question.objects.create(
-                personalized_test=test,
-                template=template,
-                prompt=template.prompt,
-                order=next_order,
+        with transaction.atomic():
+            existing_template_ids = set(
+                test.questions.exclude(template__isnull=True).values_list('template_id', flat=True)
             )
-            for option in template.options.all():
-                Option.objects.create(
-                    question=question,
-                    label=option.label,
-                    description=option.description,
-                    order=option.order,
+            next_order = test.questions.aggregate(max_order=models.Max('order')).get('max_order') or 0
+
+            new_questions = []
+            for template in templates_qs.order_by('order', 'id'):
+                if template.id in existing_template_ids:
+                    continue
+                next_order += 1
+                question = Question(
+                    personalized_test=test,
+                    template=template,
+                    prompt=template.prompt,
+                    order=next_order,
                 )
-            created_questions += 1
-
-        if created_questions == 0:
+                options = [
+                    Option(label=option.label, description=option.description, order=option.order)
+                    for option in template.options.all()
+                ]
+                new_questions.append((question, options))
+            Question.objects.bulk_create_with_options(new_questions)
+
+        if not new_questions:
             return Response({'message': 'No new questions were added (possibly already copied).'})
 
+        test = PersonalizedTest.objects.select_related('request', 'request__student').prefetch_related(
+            'questions', 'questions__options'
+        ).get(id=test.id)
         return Response({
             'message': 'Questions copied successfully.',
-            'added_questions': created_questions,
+            'added_questions': len(new_questions),
             'test': PersonalizedTestSerializer(test).data,
         }, status=201)
 
 
+class AdminCatalogImportView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, kind):
+        if request.user.role != User.Roles.ADMIN:
+            raise PermissionDenied("Only admins can import catalog data.")
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload a CSV or NDJSON file as "file".'}, status=400)
+        try:
+            chunk_size = int(request.data.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        except (TypeError, ValueError):
+            return Response({'error': 'chunk_size must be an integer.'}, status=400)
+        try:
+            fmt = request.data.get('format') or detect_format(upload.name)
+            # Read the upload line by line instead of loading it into memory.
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+            result = import_catalog(
+                kind,
+                stream,
+                fmt,
+                user=request.user,
+                chunk_size=chunk_size,
+                dry_run=request.data.get('dry_run') in (True, 'true', '1'),
+            )
+        except ImportFormatError as exc:
+            return Response({'error': str(exc)}, status=400)
+        except UnicodeDecodeError:
+            return Response({'error': 'File must be UTF-8 encoded.'}, status=400)
+        return Response(result.as_dict(), status=200 if result.error_count == 0 else 207)
+
+
+class AdminReorderView(APIView):
+    """
+    Base view for reordering the children of one parent. Expects the complete
+    ordered id list as ``{"ids": [...]}`` and writes ``order = 1..n`` with a
+    single ``bulk_update`` (one CASE UPDATE) in a transaction.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    model = None
+    parent_model = None
+    parent_field = None
+    only_active = False
+
+    def post(self, request, parent_id):
+        if request.user.role != User.Roles.ADMIN:
+            raise PermissionDenied("Only admins can reorder items.")
+        if not self.parent_model.objects.filter(id=parent_id).exists():
+            raise PermissionDenied(f"{self.parent_model._meta.verbose_name.capitalize()} not found.")
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(item_id, int) for item_id in ids):
+            return Response({'error': 'ids must be a list of integers.'}, status=400)
+        if len(ids) != len(set(ids)):
+            return Response({'error': 'ids must not contain duplicates.'}, status=400)
+
+        with transaction.atomic():
+            queryset = self.model.objects.select_for_update().filter(**{self.parent_field: parent_id})
+            if self.only_active:
+                queryset = queryset.filter(is_active=True)
+            items = queryset.in_bulk()
+            unknown_ids = sorted(set(ids) - set(items))
+            missing_ids = sorted(set(items) - set(ids))
+            if unknown_ids or missing_ids:
+                return Response({
+                    'error': 'ids must list every item of the parent exactly once.',
+                    'unknown_ids': unknown_ids,
+                    'missing_ids': missing_ids,
+                }, status=400)
+            changed = []
+            for position, item_id in enumerate(ids, start=1):
+                item = items[item_id]
+                if item.order != position:
+                    item.order = position
+                    changed.append(item)
+            self.model.objects.bulk_update(changed, ['order'])
+        return Response({'message': 'Order updated successfully.', 'ids': ids, 'updated': len(changed)})
+
+
+class AdminQuestionReorderView(AdminReorderView):
+    model = Question
+    parent_model = PersonalizedTest
+    parent_field = 'personalized_test_id'
+
+
+class AdminOptionReorderView(AdminReorderView):
+    model = Option
+    parent_model = Question
+    parent_field = 'question_id'
+
+
+class AdminRoadmapStepReorderView(AdminReorderView):
+    model = RoadmapStep
+    parent_model = CareerRecommendation
+    parent_field = 'recommendation_id'
+
+
+class AdminQuestionTemplateReorderView(AdminReorderView):
+    model = QuestionTemplate
+    parent_model = QuestionCategory
+    parent_field = 'category_id'
+    only_active = True
+
+
+class AdminOptionTemplateReorderView(AdminReorderView):
+    model = OptionTemplate
+    parent_model = QuestionTemplate
+    parent_field = 'question_id'
+
+
+class AdminResourceReorderView(AdminReorderView):
+    model = CareerResource
+    parent_model = CareerRecommendation
+    parent_field = 'career_recommendation_id'
+    only_active = True
+
+
+class AdminJobRecommendationReorderView(AdminReorderView):
+    model = JobRecommendation
+    parent_model = CareerRecommendation
+    parent_field = 'career_recommendation_id'
+    only_active = True
+
+
 class StudentResourceListView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
@@ -1070,3 +1335,70 @@ class AdminJobRecommendationDetailView(generics.RetrieveUpdateDestroyAPIView):
         # Soft delete
         instance.is_active = False
         instance.save()
+
+
+class SearchView(APIView):
+    """
+    Full-text search. Admins search every kind (``?include_inactive=1`` for
+    hidden rows too); students get active resources and jobs that are general
+    or linked to their own recommendations.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    student_kinds = (SearchDocument.Kind.RESOURCE, SearchDocument.Kind.JOB)
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not search.query_terms(query):
+            return Response({'error': 'q must contain at least one word.'}, status=400)
+
+        is_admin = request.user.role == User.Roles.ADMIN
+        allowed = SearchDocument.Kind.values if is_admin else self.student_kinds
+        requested = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+        unknown = [kind for kind in requested if kind not in allowed]
+        if unknown:
+            return Response({'error': f"Unknown type: {', '.join(unknown)}. Use {', '.join(allowed)}."}, status=400)
+
+        numbers = {}
+        for param, default in (('category', None), ('limit', 20), ('offset', 0)):
+            value = request.query_params.get(param)
+            if value is None:
+                numbers[param] = default
+            elif value.isdigit():
+                numbers[param] = int(value)
+            else:
+                return Response({'error': f'{param} must be a non-negative integer.'}, status=400)
+
+        if numbers['category'] is not None and len(requested) != 1:
+            # Each kind has its own category table, so ids only make sense for one type.
+            return Response({'error': 'category needs exactly one type.'}, status=400)
+
+        documents = search.search(
+            query,
+            kinds=requested or allowed,
+            category_id=numbers['category'],
+            resource_type=request.query_params.get('resource_type') or None,
+            difficulty_level=request.query_params.get('difficulty_level') or None,
+            active_only=not (is_admin and request.query_params.get('include_inactive') == '1'),
+            recommendation_ids=None if is_admin else list(CareerRecommendation.objects.filter(
+                personalized_test__request__student=request.user
+            ).values_list('id', flat=True)),
+            limit=min(numbers['limit'], self.max_limit),
+            offset=numbers['offset'],
+        )
+        return Response({
+            'results': [
+                {
+                    'type': document.kind,
+                    'id': document.object_id,
+                    'title': document.title,
+                    'snippet': document.body[:200],
+                    'score': document.score,
+                    'category_id': document.category_id,
+                    'resource_type': document.resource_type or None,
+                    'difficulty_level': document.difficulty_level or None,
+                    'is_active': document.is_active,
+                }
+                for document in documents
+            ]
+        })
@@ -85,6 +85,7 @@ export const fetchStudentRecommendations = async () => {
 
 export const exportRecommendationPDF = async (recommendationId: number) => {
   const response = await api.get(`student/recommendations/${recommendationId}/export/`, {
+    params: { format: 'pdf' },
     responseType: 'blob',
   })
   